@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 """
 Simple Flask app for Project Blackbox on DigitalOcean App Platform
-Serves both WebSocket connections and static files
+Serves Socket.IO control events (voice, ping) and static files
+High-rate telemetry is streamed through the plain WebSocket server in server.py
 """
-from flask import Flask, render_template, send_from_directory
+# eventlet must patch the stdlib before anything else imports socket/threading
+import eventlet
+eventlet.monkey_patch()
+
+from flask import Flask, render_template, request, send_from_directory
 from flask_socketio import SocketIO, emit
 import os
 import logging
-from datetime import datetime
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,8 +29,33 @@ app = Flask(__name__,
             template_folder='static/team')
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'blackbox-secret-key')
 
-# Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Static assets are cached by browsers for 25 days; index.html is always revalidated
+STATIC_MAX_AGE = 2160000
+STATIC_CACHE_EXTENSIONS = ('.js', '.css', '.png', '.jpg', '.jpeg', '.svg', '.ico', '.woff', '.woff2')
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
+
+class OrjsonCodec:
+    """json-module shim so Socket.IO packets are encoded with orjson"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+# Initialize SocketIO on eventlet so broadcast emits fan out through greenlets
+socketio_options = {
+    'cors_allowed_origins': "*",
+    'async_mode': 'eventlet',
+    # Compress polling payloads, but leave tiny control messages alone
+    'http_compression': True,
+    'compression_threshold': 200,
+}
+if orjson is not None:
+    socketio_options['json'] = OrjsonCodec
+socketio = SocketIO(app, **socketio_options)
 
 print("Starting Project Blackbox Flask app...")
 logger.info("Flask app initialization starting")
@@ -43,13 +78,24 @@ def static_files(filename):
         logger.error(f"Error serving {filename}: {e}")
         return f"File not found: {filename}", 404
 
+@app.after_request
+def add_cache_headers(response):
+    """Set Cache-Control so static assets aren't re-fetched on every load"""
+    # Never let an error page (e.g. a missing asset's 404) be cached for weeks
+    if response.status_code in (200, 304) and request.path.endswith(STATIC_CACHE_EXTENSIONS):
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+    else:
+        response.cache_control.no_cache = True
+    return response
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     logger.info(f"Client connected: {request.sid if 'request' in globals() else 'unknown'}")
     emit('status', {
         'type': 'connection_confirmed',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': time.time(),
         'message': 'Connected to Project Blackbox backend'
     })
 
@@ -58,17 +104,6 @@ def handle_disconnect():
     """Handle client disconnection"""
     logger.info(f"Client disconnected: {request.sid if 'request' in globals() else 'unknown'}")
 
-@socketio.on('telemetry')
-def handle_telemetry(data):
-    """Handle telemetry data"""
-    logger.info("Received telemetry data")
-    # Broadcast to all connected clients
-    emit('telemetry_update', {
-        'type': 'telemetry_update',
-        'data': data,
-        'timestamp': datetime.now().isoformat()
-    }, broadcast=True)
-
 @socketio.on('voice')
 def handle_voice(data):
     """Handle voice communication"""
@@ -77,7 +112,7 @@ def handle_voice(data):
     emit('voice_message', {
         'type': 'voice_message',
         'data': data,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': time.time()
     }, broadcast=True)
 
 @socketio.on('ping')
@@ -85,7 +120,7 @@ def handle_ping():
     """Handle ping requests"""
     emit('pong', {
         'type': 'pong',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': time.time()
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for Project Blackbox
+Serves the Team Engineer HUD, health endpoints and the telemetry WebSocket
+from a single uvicorn process:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8080 --loop uvloop --http httptools
+
+Broadcast fan-out lives in this process's memory, so run one worker per app.
+"""
+import os
+
+import websockets
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, HTMLResponse, JSONResponse
+from starlette.routing import Mount, Route, WebSocketRoute
+from starlette.staticfiles import StaticFiles
+from starlette.websockets import WebSocketDisconnect
+
+import server
+
+STATIC_DIR = 'static/team'
+# Static assets are cached by browsers for 30 days; index.html is always revalidated
+STATIC_MAX_AGE = 2592000
+STATIC_CACHE_EXTENSIONS = ('.js', '.css', '.png', '.jpg', '.jpeg', '.svg', '.ico', '.woff', '.woff2')
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks versioned asset types as long-lived"""
+
+    def file_response(self, full_path, *args, **kwargs):
+        response = super().file_response(full_path, *args, **kwargs)
+        if str(full_path).endswith(STATIC_CACHE_EXTENSIONS):
+            response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+class ClientSocket:
+    """Adapts a Starlette WebSocket to the send() interface used by server.py"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+
+    async def send(self, message):
+        try:
+            await self.websocket.send_text(message)
+        except (WebSocketDisconnect, RuntimeError):
+            # server.client_writer stops on the websockets library's close error
+            raise websockets.exceptions.ConnectionClosedOK(None, None)
+
+async def index(request):
+    """Serve the Team Engineer HUD"""
+    index_path = os.path.join(STATIC_DIR, 'index.html')
+    if os.path.exists(index_path):
+        return FileResponse(index_path, headers={'Cache-Control': 'no-cache'})
+    return HTMLResponse("<h1>Project Blackbox</h1><p>Team Engineer HUD loading...</p>")
+
+async def health(request):
+    """Health check endpoint"""
+    return JSONResponse({"status": "healthy", "service": "project-blackbox"})
+
+async def api_test(request):
+    """API test endpoint"""
+    return JSONResponse({"message": "API is working", "status": "success"})
+
+async def telemetry_socket(websocket):
+    """Telemetry/voice WebSocket, sharing server.py's message handling"""
+    await websocket.accept()
+    client = ClientSocket(websocket)
+    writer = server.register_client(client)
+    try:
+        while True:
+            # receive() accepts text and binary frames; handle_frame's loads takes either
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                server.logger.info("Client disconnected")
+                break
+            data = message.get('text')
+            if data is None:
+                data = message.get('bytes')
+            if data is not None:
+                await server.handle_frame(client, data)
+    except WebSocketDisconnect:
+        server.logger.info("Client disconnected")
+    finally:
+        server.unregister_client(client, writer)
+
+app = Starlette(routes=[
+    Route('/', index),
+    Route('/health', health),
+    Route('/api/test', api_test),
+    WebSocketRoute('/ws', telemetry_socket),
+    Mount('/', app=CachedStaticFiles(directory=STATIC_DIR, check_dir=False)),
+])
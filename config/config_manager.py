@@ -9,10 +9,16 @@ Usage:
 - API keys for ElevenLabs, Whisper, etc. are stored in config['api_keys']
 - Keybindings for overlay, PTT, device cycling, etc. are stored in config['keybindings']
 """
+import copy
 import json
 import os
 from platformdirs import user_config_dir
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 CONFIG_PATH = user_config_dir("BlackboxDriver")
 SETTINGS_FILE = os.path.join(CONFIG_PATH, "settings.json")
 SETTINGS_LOCAL_FILE = os.path.join(os.path.dirname(__file__), "settings.local.json")
@@ -46,23 +52,36 @@ DEFAULT_CONFIG = {
     "profile": "default"
 }
 
+# Parsed settings files keyed by path, as (mtime, data)
+_cache = {}
+
+def _read_settings(path):
+    """Return the parsed settings file, re-reading only when its mtime changes"""
+    mtime = os.stat(path).st_mtime
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+        _cache[path] = cached = (mtime, data)
+    # Callers mutate the returned config, so never hand out the cached dicts
+    return copy.deepcopy(cached[1])
+
 def load_config():
     """Load configuration from settings file, preferring local settings"""
-    config = DEFAULT_CONFIG.copy()
+    config = copy.deepcopy(DEFAULT_CONFIG)
     
     # First try to load from user config directory
     if os.path.exists(SETTINGS_FILE):
         try:
-            with open(SETTINGS_FILE, 'r') as f:
-                config.update(json.load(f))
+            config.update(_read_settings(SETTINGS_FILE))
         except Exception as e:
             print(f"Error loading config from {SETTINGS_FILE}: {e}")
     
     # Then try to load from local settings (overrides user config)
     if os.path.exists(SETTINGS_LOCAL_FILE):
         try:
-            with open(SETTINGS_LOCAL_FILE, 'r') as f:
-                config.update(json.load(f))
+            config.update(_read_settings(SETTINGS_LOCAL_FILE))
         except Exception as e:
             print(f"Error loading local config from {SETTINGS_LOCAL_FILE}: {e}")
     
@@ -9,6 +9,41 @@ import json
 import subprocess
 from pathlib import Path
 
+# pygit2 runs git operations in-process; fall back to the git CLI without it
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+def _init_repo():
+    if pygit2:
+        pygit2.init_repository('.')
+    else:
+        subprocess.run(['git', 'init'], check=True)
+
+def _commit_all(message):
+    """Stage every file and commit; returns False when there is nothing to commit"""
+    if not pygit2:
+        subprocess.run(['git', 'add', '.'], check=True)
+        return subprocess.run(['git', 'commit', '-m', message]).returncode == 0
+    repo = pygit2.Repository('.')
+    repo.index.add_all()
+    repo.index.write()
+    tree = repo.index.write_tree()
+    parents = [] if repo.head_is_unborn else [repo.head.target]
+    if parents and repo[parents[0]].tree_id == tree:
+        return False
+    signature = repo.default_signature
+    repo.create_commit('HEAD', signature, signature, message, tree, parents)
+    return True
+
+def _create_tag(name):
+    if pygit2:
+        repo = pygit2.Repository('.')
+        repo.create_reference(f'refs/tags/{name}', repo.head.target)
+    else:
+        subprocess.run(['git', 'tag', name], check=True)
+
 def setup_github_repo():
     """Initialize GitHub repository for remote updates"""
     print("🐙 Setting up GitHub repository...")
@@ -16,7 +51,7 @@ def setup_github_repo():
     # Check if git is initialized
     if not Path('.git').exists():
         print("Initializing git repository...")
-        subprocess.run(['git', 'init'], check=True)
+        _init_repo()
         
     # Create .gitignore if it doesn't exist
     gitignore_content = """
@@ -61,14 +96,10 @@ build/
     with open('.gitignore', 'w') as f:
         f.write(gitignore_content.strip())
     
-    # Add all files
-    subprocess.run(['git', 'add', '.'], check=True)
-    
-    # Initial commit
-    try:
-        subprocess.run(['git', 'commit', '-m', 'Initial commit - PROJECT:BLACKBOX v1.0.0'], check=True)
+    # Add all files and make the initial commit
+    if _commit_all('Initial commit - PROJECT:BLACKBOX v1.0.0'):
         print("✅ Git repository initialized")
-    except subprocess.CalledProcessError:
+    else:
         print("ℹ️  Git repository already has commits")
     
     print("\n📋 Next steps for GitHub:")
@@ -130,8 +161,8 @@ def create_release():
     if not version.startswith('v'):
         version = f'v{version}'
     
-    # Create and push tag
-    subprocess.run(['git', 'tag', version], check=True)
+    # Create and push tag (push needs the CLI for the user's credentials)
+    _create_tag(version)
     subprocess.run(['git', 'push', 'origin', version], check=True)
     
     print(f"✅ Release {version} created and pushed to GitHub")
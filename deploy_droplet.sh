@@ -29,7 +29,7 @@ source venv/bin/activate
 # Install Python dependencies
 echo "📚 Installing Python dependencies..."
 pip install --upgrade pip
-pip install Flask>=2.3.0 Flask-SocketIO>=5.3.0 requests>=2.31.0 gunicorn
+pip install 'Flask>=2.3.0' 'Flask-SocketIO>=5.3.0' 'eventlet>=0.33.0' 'requests>=2.31.0' "websockets<14" starlette "uvicorn[standard]" gunicorn
 
 # Create systemd service
 echo "⚙️ Creating systemd service..."
@@ -44,7 +44,27 @@ User=$USER
 WorkingDirectory=/opt/project-blackbox
 Environment=PATH=/opt/project-blackbox/venv/bin
 Environment=PORT=8080
-ExecStart=/opt/project-blackbox/venv/bin/gunicorn --bind 0.0.0.0:8080 --workers 4 app:app
+ExecStart=/opt/project-blackbox/venv/bin/gunicorn --worker-class eventlet --bind 0.0.0.0:8080 --workers 1 app:app
+Restart=always
+RestartSec=3
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+# Create systemd service for the telemetry WebSocket server
+sudo tee /etc/systemd/system/project-blackbox-ws.service > /dev/null <<EOF
+[Unit]
+Description=Project Blackbox Telemetry WebSocket Server (uvicorn)
+After=network.target
+
+[Service]
+Type=simple
+User=$USER
+WorkingDirectory=/opt/project-blackbox
+Environment=PATH=/opt/project-blackbox/venv/bin
+Environment=PORT=8766
+ExecStart=/opt/project-blackbox/venv/bin/uvicorn asgi:app --host 127.0.0.1 --port 8766 --loop uvloop --http httptools
 Restart=always
 RestartSec=3
 
@@ -59,6 +79,25 @@ server {
     listen 80;
     server_name _;
 
+    sendfile on;
+    tcp_nopush on;
+    tcp_nodelay on;
+    gzip on;
+    gzip_types text/css application/javascript application/json image/svg+xml;
+
+    # Serve static HUD assets straight from disk with long-lived caching
+    location ~* \.(js|css|png|jpg|jpeg|svg|ico|woff2?)\$ {
+        root /opt/project-blackbox/static/team;
+        add_header Cache-Control "public, max-age=2160000";
+        access_log off;
+        try_files \$uri @app;
+    }
+
+    location @app {
+        proxy_pass http://127.0.0.1:8080;
+        proxy_set_header Host \$host;
+    }
+
     location / {
         proxy_pass http://127.0.0.1:8080;
         proxy_set_header Host \$host;
@@ -67,6 +106,16 @@ server {
         proxy_set_header X-Forwarded-Proto \$scheme;
     }
 
+    # Telemetry WebSocket server (asgi.py)
+    location /ws {
+        proxy_pass http://127.0.0.1:8766;
+        proxy_http_version 1.1;
+        proxy_set_header Upgrade \$http_upgrade;
+        proxy_set_header Connection "upgrade";
+        proxy_set_header Host \$host;
+        proxy_read_timeout 3600s;
+    }
+
     location /socket.io/ {
         proxy_pass http://127.0.0.1:8080;
         proxy_http_version 1.1;
@@ -92,6 +141,8 @@ echo "🔄 Starting services..."
 sudo systemctl daemon-reload
 sudo systemctl enable project-blackbox
 sudo systemctl start project-blackbox
+sudo systemctl enable project-blackbox-ws
+sudo systemctl start project-blackbox-ws
 sudo systemctl enable nginx
 sudo systemctl restart nginx
 
@@ -109,7 +160,7 @@ cd /opt/project-blackbox
 git pull origin master
 source venv/bin/activate
 pip install -r requirements.txt
-sudo systemctl restart project-blackbox
+sudo systemctl restart project-blackbox project-blackbox-ws
 echo "✅ Project Blackbox updated successfully!"
 EOF
 chmod +x /opt/project-blackbox/update.sh
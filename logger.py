@@ -2,9 +2,13 @@
 Lightweight logger for Blackbox Driver
 - Supports info, warning, error, debug
 - Logs to console and optionally to file
+- File writes happen on a background thread so callers never block on disk I/O
 """
+import atexit
 import datetime
 import os
+import queue
+import threading
 
 LOG_LEVELS = {"info": 1, "warning": 2, "error": 3, "debug": 0}
 LOG_FILE = os.path.join(os.path.dirname(__file__), "blackbox.log")
@@ -13,15 +17,44 @@ class Logger:
     def __init__(self, level="info", to_file=False):
         self.level = level
         self.to_file = to_file
+        self._threshold = LOG_LEVELS[level]
+        self._queue = None
+        self._writer = None
+        if to_file:
+            self._queue = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def _write_loop(self):
+        # Keep one buffered handle open; flush whenever the backlog is drained
+        with open(LOG_FILE, "a", buffering=8192) as f:
+            while True:
+                line = self._queue.get()
+                if line is None:
+                    break
+                f.write(line)
+                if self._queue.empty():
+                    f.flush()
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def is_enabled_for(self, level):
+        """Check before building expensive messages that may be filtered out"""
+        return LOG_LEVELS[level] >= self._threshold
 
     def log(self, msg, level="info"):
-        if LOG_LEVELS[level] >= LOG_LEVELS[self.level]:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            out = f"[{timestamp}] [{level.upper()}] {msg}"
-            print(out)
-            if self.to_file:
-                with open(LOG_FILE, "a") as f:
-                    f.write(out + "\n")
+        if LOG_LEVELS[level] < self._threshold:
+            return
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        out = f"[{timestamp}] [{level.upper()}] {msg}"
+        print(out)
+        if self._queue is not None:
+            self._queue.put(out + "\n")
 
     def info(self, msg):
         self.log(msg, "info")
@@ -31,8 +31,9 @@ def validate_config(config, logger):
     import sounddevice as sd
     input_device = config.get('voice', {}).get('input_device', 'default')
     output_device = config.get('voice', {}).get('output_device', 'default')
-    input_devices = [d['name'] for d in sd.query_devices() if d['max_input_channels'] > 0]
-    output_devices = [d['name'] for d in sd.query_devices() if d['max_output_channels'] > 0]
+    devices = sd.query_devices()
+    input_devices = {d['name'] for d in devices if d['max_input_channels'] > 0}
+    output_devices = {d['name'] for d in devices if d['max_output_channels'] > 0}
     if input_device not in input_devices:
         logger.error(f"[Preflight] Input device '{input_device}' not found.")
         errors.append(f"Input device '{input_device}' not found.")
@@ -51,7 +52,31 @@ def validate_config(config, logger):
         logger.info("[Preflight] Configuration validated successfully.")
     return valid
 
-import time
+import asyncio
+
+STATUS_INTERVAL = 0.5  # seconds between health/status refreshes
+
+async def status_task(telemetry, voice, network, ui):
+    """Periodic health check and UI status update"""
+    while True:
+        tele_stat = telemetry.get_status() if hasattr(telemetry, 'get_status') else ('OK', '')
+        voice_stat = voice.get_status() if hasattr(voice, 'get_status') else ('OK', '')
+        net_stat = network.get_status() if hasattr(network, 'get_status') else ('OK', '')
+        ui_stat = ui.get_status() if hasattr(ui, 'get_status') else ('OK', '')
+        if hasattr(ui, 'update_status'):
+            ui.update_status(tele_stat, voice_stat, net_stat, ui_stat)
+        await asyncio.sleep(STATUS_INTERVAL)
+
+async def run_modules(telemetry, voice, network, ui, update_manager):
+    """Run every module's event loop concurrently until interrupted"""
+    await asyncio.gather(
+        telemetry.run(),
+        voice.run(),
+        network.run(),
+        ui.run(),
+        update_manager.run(),
+        status_task(telemetry, voice, network, ui),
+    )
 
 def main():
     logger = Logger(level="info", to_file=True)
@@ -70,6 +95,7 @@ def main():
     network = NetworkManager(config, logger=logger)
     ui = DriverOverlay(config, telemetry, voice, network, logger=logger)
     update_manager = UpdateManager(config, logger=logger)
+    telemetry.attach_network(network)
 
     # Start modules
     telemetry.start()
@@ -83,21 +109,7 @@ def main():
 
     logger.info("[BlackboxDriver] All systems started. Running main loop...")
     try:
-        while True:
-            telemetry.update()
-            voice.update()
-            network.update()
-            ui.update()
-            # Periodic health check and UI update
-            tele_stat = telemetry.get_status() if hasattr(telemetry, 'get_status') else ('OK', '')
-            voice_stat = voice.get_status() if hasattr(voice, 'get_status') else ('OK', '')
-            net_stat = network.get_status() if hasattr(network, 'get_status') else ('OK', '')
-            ui_stat = ui.get_status() if hasattr(ui, 'get_status') else ('OK', '')
-            ui.update_status(tele_stat, voice_stat, net_stat, ui_stat)
-            time.sleep(0.5)
-            
-            # Periodic update check
-            update_manager.auto_update_check()
+        asyncio.run(run_modules(telemetry, voice, network, ui, update_manager))
     except KeyboardInterrupt:
         logger.info("[BlackboxDriver] Shutting down...")
         telemetry.stop()
@@ -3,8 +3,19 @@ Network Manager
 - Handles WebSocket/REST communication with Engine
 - Manages authentication, reconnection, and status
 """
+import asyncio
 import threading
 import platform
+import time
+
+RECONNECT_INTERVAL = 5  # seconds between reconnect attempts
+# HTTP telemetry is posted as a JSON array once either limit is reached
+HTTP_BATCH_SIZE = 32
+HTTP_BATCH_INTERVAL = 0.1  # seconds
+# WebSocket telemetry frames carry up to this many queued payloads
+WS_BATCH_MAX_ITEMS = 128
+# Outbound WebSocket backlog; the oldest payload is dropped while the link is stalled
+WS_QUEUE_SIZE = 1024
 
 class NetworkManager:
     def __init__(self, config, logger=None):
@@ -13,11 +24,42 @@ class NetworkManager:
         self.active = False
         self.status = 'OK'
         self.status_detail = ''
-        self.connected = False
+        self._status_listeners = []
+        self._connected = False
         self.connection = None
+        # Endpoint settings, resolved once in start()
+        self._url = ''
+        self._api_key = ''
+        self._is_ws = False
+        self._is_http = False
+        self._session = None
+        self._http_buffer = []
+        self._http_last_flush = time.monotonic()
+        # WebSocket transport runs on its own asyncio loop in a background thread
+        self._loop = None
+        self._out_queue = None
+        self._writer = None
         self.lock = threading.Lock()
+        # start(), run() and update() may all try to connect; only one attempt runs at a time
+        self._connect_lock = threading.Lock()
         self.os_type = platform.system()
 
+    @property
+    def connected(self):
+        return self._connected
+
+    @connected.setter
+    def connected(self, value):
+        changed = value != self._connected
+        self._connected = value
+        if changed:
+            for callback in self._status_listeners:
+                callback(value)
+
+    def on_status_change(self, callback):
+        # callback(connected) runs on whichever thread changed the state
+        self._status_listeners.append(callback)
+
     def validate(self):
         valid = True
         errors = []
@@ -42,15 +84,20 @@ class NetworkManager:
         return (self.status, self.status_detail)
 
     def connect(self):
-        url = self.config.get('network', {}).get('server_url', '')
-        api_key = self.config.get('network', {}).get('api_key', '')
-        if url.startswith('ws'):
+        if not self._connect_lock.acquire(blocking=False):
+            return
+        try:
+            self._connect()
+        finally:
+            self._connect_lock.release()
+
+    def _connect(self):
+        url = self._url
+        api_key = self._api_key
+        if self._is_ws:
             try:
-                import websocket
-                headers = []
-                if api_key:
-                    headers.append(f"Authorization: Bearer {api_key}")
-                self.connection = websocket.create_connection(url, header=headers, timeout=5)
+                future = asyncio.run_coroutine_threadsafe(self._connect_ws(url, api_key), self._loop)
+                future.result(timeout=10)
                 self.connected = True
                 self.status = 'OK'
                 self.status_detail = 'Connected to backend (WebSocket)'
@@ -62,11 +109,9 @@ class NetworkManager:
                 self.status_detail = f'WebSocket connect failed: {e}'
                 if self.logger:
                     self.logger.error(f"[Network] WebSocket connect failed: {e}")
-        elif url.startswith('http'):
+        elif self._is_http:
             try:
-                import requests
-                headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
-                resp = requests.get(url, headers=headers, timeout=5)
+                resp = self._get_session().get(url, timeout=5)
                 if resp.status_code == 200:
                     self.connected = True
                     self.status = 'OK'
@@ -92,11 +137,68 @@ class NetworkManager:
             if self.logger:
                 self.logger.error(f"[Network] Unknown backend URL scheme: {url}")
 
+    def _get_session(self):
+        # Pooled HTTP session shared by the connect probe and telemetry posts
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            self._session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            if self._api_key:
+                self._session.headers.update({"Authorization": f"Bearer {self._api_key}"})
+        return self._session
+
+    async def _connect_ws(self, url, api_key):
+        import websockets
+        headers = [("Authorization", f"Bearer {api_key}")] if api_key else []
+        if self._writer:
+            self._writer.cancel()
+        # Close the previous socket on reconnect so it doesn't linger on keepalive pings
+        if self.connection:
+            try:
+                await self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+        self.connection = await websockets.connect(url, extra_headers=headers, open_timeout=5,
+                                                   compression='deflate')
+        self._out_queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+        self._writer = asyncio.ensure_future(self._ws_writer(self.connection, self._out_queue))
+
+    async def _ws_writer(self, ws, queue):
+        # Drain queued telemetry into one JSON array frame per send
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < WS_BATCH_MAX_ITEMS and not queue.empty():
+                    batch.append(queue.get_nowait())
+                items = [d.decode() if isinstance(d, bytes) else d for d in batch]
+                await ws.send('[' + ','.join(items) + ']')
+        except Exception as e:
+            self.connected = False
+            self.status = 'ERROR'
+            self.status_detail = f'Send failed: {e}'
+            if self.logger:
+                self.logger.error(f"[Network] WebSocket send failed: {e}")
+
+    async def _close_ws(self):
+        if self._writer:
+            self._writer.cancel()
+            self._writer = None
+        if self.connection:
+            await self.connection.close()
+
     def disconnect(self):
+        if self._http_buffer and self.connected:
+            self._flush_http()
         with self.lock:
+            if self._session:
+                self._session.close()
+                self._session = None
             if self.connection:
                 try:
-                    self.connection.close()
+                    asyncio.run_coroutine_threadsafe(self._close_ws(), self._loop).result(timeout=5)
                 except Exception:
                     pass
                 self.connection = None
@@ -110,17 +212,61 @@ class NetworkManager:
         # Send telemetry data to backend
         if not self.connected:
             return False
-        url = self.config.get('network', {}).get('server_url', '')
         try:
-            if url.startswith('ws'):
-                self.connection.send(data)
+            if self._is_ws:
+                # Hand off to the writer task; it batches and sends without blocking us
+                self._loop.call_soon_threadsafe(self._enqueue_ws, (data,))
+                return True
+            elif self._is_http:
+                self._http_buffer.append(data)
+                if (len(self._http_buffer) >= HTTP_BATCH_SIZE
+                        or time.monotonic() - self._http_last_flush >= HTTP_BATCH_INTERVAL):
+                    return self._flush_http()
                 return True
-            elif url.startswith('http'):
-                import requests
-                api_key = self.config.get('network', {}).get('api_key', '')
-                headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
-                resp = requests.post(url, headers=headers, data=data, timeout=5)
-                return resp.status_code == 200
+        except Exception as e:
+            self.status = 'ERROR'
+            self.status_detail = f'Send failed: {e}'
+            if self.logger:
+                self.logger.error(f"[Network] Send failed: {e}")
+            return False
+
+    def send_telemetry_batch(self, items):
+        # Send several telemetry payloads; they share one frame/POST with other queued data
+        if not self.connected:
+            return False
+        try:
+            if self._is_ws:
+                self._loop.call_soon_threadsafe(self._enqueue_ws, items)
+                return True
+            elif self._is_http:
+                self._http_buffer.extend(items)
+                return self._flush_http()
+        except Exception as e:
+            self.status = 'ERROR'
+            self.status_detail = f'Send failed: {e}'
+            if self.logger:
+                self.logger.error(f"[Network] Send failed: {e}")
+            return False
+
+    def _enqueue_ws(self, items):
+        # Runs on the transport loop
+        queue = self._out_queue
+        for item in items:
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                queue.get_nowait()
+                queue.put_nowait(item)
+
+    def _flush_http(self):
+        # Post buffered telemetry as a single JSON array over the pooled session
+        items = [d.encode() if isinstance(d, str) else d for d in self._http_buffer]
+        self._http_buffer = []
+        self._http_last_flush = time.monotonic()
+        try:
+            resp = self._get_session().post(self._url, data=b'[' + b','.join(items) + b']',
+                                      headers={"Content-Type": "application/json"}, timeout=5)
+            return resp.status_code == 200
         except Exception as e:
             self.status = 'ERROR'
             self.status_detail = f'Send failed: {e}'
@@ -136,8 +282,16 @@ class NetworkManager:
                 self.logger.error(f"[Network] Not starting due to config error: {self.status_detail}")
             self.active = False
             return
+        network = self.config['network']
+        self._url = network['server_url']
+        self._api_key = network.get('api_key', '')
+        self._is_ws = self._url.startswith('ws')
+        self._is_http = self._url.startswith('http')
         self.active = True
-        if self.os_type == 'Windows' or self.config.get('network', {}).get('server_url', '').startswith('ws'):
+        if self._is_ws and self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        if self.os_type == 'Windows' or self._is_ws:
             threading.Thread(target=self.connect, daemon=True).start()
         else:
             # On Mac, simulate connection for dev
@@ -154,8 +308,18 @@ class NetworkManager:
         if not self.connected and self.active:
             self.connect()
 
+    async def run(self):
+        """Reconnect in the background whenever the backend connection drops"""
+        while self.active:
+            if not self.connected:
+                await asyncio.to_thread(self.connect)
+            await asyncio.sleep(RECONNECT_INTERVAL)
+
     def stop(self):
         if self.logger:
             self.logger.info("[Network] Stopping...")
         self.disconnect()
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
         self.active = False
@@ -2,121 +2,177 @@
 """
 Simple backend server for Project Blackbox on DigitalOcean App Platform
 Handles WebSocket connections, telemetry streaming, and voice communication
+Static HUD files are served by nginx (see deploy_droplet.sh), not by this process
 """
 import asyncio
 import websockets
 import json
 import logging
 import os
+import socket
 import sys
+import time
 from datetime import datetime
 
+# orjson is a much faster encoder; fall back to the stdlib when it isn't installed
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    loads = orjson.loads
+except ImportError:
+    dumps = json.dumps
+    loads = json.loads
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Store active connections
+# Store active connections and their outbound message queues
 clients = set()
+client_queues = {}
+
+# Outbound messages are coalesced into a single batch frame per client
+BATCH_MAX_ITEMS = 128
+BATCH_WINDOW = 0.005  # seconds
+# Larger kernel send buffer so batched bursts go out in one write
+CLIENT_SNDBUF = 1 << 20
+# Per-client backlog; the oldest message is dropped when a slow client falls behind
+CLIENT_QUEUE_SIZE = 256
 
 print("Starting Project Blackbox server...")
 logger.info("Server initialization starting")
 
-async def handle_client(websocket, path):
-    """Handle WebSocket client connections"""
+def tune_client_socket(websocket):
+    """Disable Nagle and enlarge the send buffer for small, frequent frames"""
+    sock = websocket.transport.get_extra_info('socket')
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CLIENT_SNDBUF)
+    except OSError as e:
+        logger.warning(f"Could not tune client socket: {e}")
+
+def register_client(websocket):
+    """Track a connected client and start its batching writer task"""
+    queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    client_queues[websocket] = queue
     clients.add(websocket)
     logger.info(f"Client connected. Total clients: {len(clients)}")
+    return asyncio.create_task(client_writer(websocket, queue))
+
+def unregister_client(websocket, writer):
+    """Forget a disconnected client and stop its writer task"""
+    clients.discard(websocket)
+    client_queues.pop(websocket, None)
+    writer.cancel()
+    logger.info(f"Client removed. Total clients: {len(clients)}")
+
+async def handle_frame(websocket, message):
+    """Decode one incoming frame and dispatch every message it carries"""
+    try:
+        data = loads(message)
+        # Producers may send a JSON array of messages in one frame
+        for item in (data if isinstance(data, list) else [data]):
+            await handle_message(websocket, item)
+            
+    except json.JSONDecodeError:
+        logger.error("Invalid JSON received")
+    except Exception as e:
+        logger.error(f"Error handling message: {e}")
+
+async def handle_client(websocket, path):
+    """Handle WebSocket client connections"""
+    tune_client_socket(websocket)
+    writer = register_client(websocket)
     
     try:
         async for message in websocket:
-            try:
-                data = json.loads(message)
-                message_type = data.get('type', 'unknown')
-                
-                # Handle different message types
-                if message_type == 'telemetry':
-                    # Broadcast telemetry to all connected clients
-                    await broadcast_to_clients({
-                        'type': 'telemetry_update',
-                        'data': data.get('data', {}),
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    
-                elif message_type == 'voice':
-                    # Handle voice communication
-                    await broadcast_to_clients({
-                        'type': 'voice_message',
-                        'data': data.get('data', {}),
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    
-                elif message_type == 'ping':
-                    # Respond to ping with pong
-                    await websocket.send(json.dumps({
-                        'type': 'pong',
-                        'timestamp': datetime.now().isoformat()
-                    }))
-                    
-                elif message_type == 'status':
-                    # Send status update
-                    await websocket.send(json.dumps({
-                        'type': 'status_response',
-                        'connected_clients': len(clients),
-                        'timestamp': datetime.now().isoformat()
-                    }))
-                    
-                else:
-                    logger.warning(f"Unknown message type: {message_type}")
-                    
-            except json.JSONDecodeError:
-                logger.error("Invalid JSON received")
-            except Exception as e:
-                logger.error(f"Error handling message: {e}")
+            await handle_frame(websocket, message)
                 
     except websockets.exceptions.ConnectionClosed:
         logger.info("Client disconnected")
     finally:
-        clients.discard(websocket)
-        logger.info(f"Client removed. Total clients: {len(clients)}")
-
-async def broadcast_to_clients(message):
-    """Broadcast message to all connected clients"""
-    if clients:
-        message_json = json.dumps(message)
-        await asyncio.gather(
-            *[client.send(message_json) for client in clients],
-            return_exceptions=True
-        )
-
-async def health_check():
-    """Periodic health check and cleanup"""
-    while True:
-        await asyncio.sleep(30)  # Check every 30 seconds
+        unregister_client(websocket, writer)
+
+async def handle_message(websocket, data):
+    """Dispatch a single decoded client message"""
+    message_type = data.get('type', 'unknown')
+    
+    # Handle different message types
+    if message_type == 'telemetry':
+        # Broadcast telemetry to all connected clients
+        broadcast_to_clients({
+            'type': 'telemetry_update',
+            'data': data.get('data', {}),
+            'timestamp': datetime.now().isoformat()
+        })
         
-        # Remove disconnected clients
-        disconnected = []
-        for client in clients.copy():
-            if client.closed:
-                disconnected.append(client)
+    elif message_type == 'voice':
+        # Handle voice communication
+        broadcast_to_clients({
+            'type': 'voice_message',
+            'data': data.get('data', {}),
+            'timestamp': datetime.now().isoformat()
+        })
         
-        for client in disconnected:
-            clients.discard(client)
-            
-        if disconnected:
-            logger.info(f"Cleaned up {len(disconnected)} disconnected clients")
-
-import http.server
-import socketserver
-import threading
-from urllib.parse import urlparse
-
-def serve_static_files():
-    """Serve static files from static/team directory"""
-    import os
-    os.chdir('static/team')
-    handler = http.server.SimpleHTTPRequestHandler
-    httpd = socketserver.TCPServer(("", 8081), handler)
-    logger.info("Static file server started on port 8081")
-    httpd.serve_forever()
+    elif message_type == 'ping':
+        # Respond to ping with pong
+        await websocket.send(dumps({
+            'type': 'pong',
+            'timestamp': time.time()
+        }))
+        
+    elif message_type == 'status':
+        # Send status update
+        await websocket.send(dumps({
+            'type': 'status_response',
+            'connected_clients': len(clients),
+            'timestamp': time.time()
+        }))
+        
+    else:
+        logger.warning(f"Unknown message type: {message_type}")
+
+def broadcast_to_clients(message):
+    """Encode message once and queue it for every connected client's writer task"""
+    if not client_queues:
+        return
+    message_json = dumps(message)
+    for queue in client_queues.values():
+        try:
+            queue.put_nowait(message_json)
+        except asyncio.QueueFull:
+            queue.get_nowait()
+            queue.put_nowait(message_json)
+
+async def client_writer(websocket, queue):
+    """Send queued messages to one client, coalesced into batch frames"""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            items = [await queue.get()]
+            deadline = loop.time() + BATCH_WINDOW
+            while len(items) < BATCH_MAX_ITEMS:
+                try:
+                    items.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Items are already encoded, so splice them into the batch envelope
+            await websocket.send('{"type":"batch","items":[' + ','.join(items) + ']}')
+    except websockets.exceptions.ConnectionClosed:
+        pass
 
 def main():
     """Main server entry point"""
@@ -125,15 +181,19 @@ def main():
     
     logger.info(f"Starting Project Blackbox WebSocket server on {host}:{port}")
     
-    # Start static file server in background thread
-    static_thread = threading.Thread(target=serve_static_files, daemon=True)
-    static_thread.start()
-    
-    # Start health check task
-    asyncio.get_event_loop().create_task(health_check())
+    # Prefer uvloop's libuv event loop when it is installed
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        pass
     
-    # Start WebSocket server
-    start_server = websockets.serve(handle_client, host, port)
+    # Start WebSocket server; keepalive pings let the library drop dead connections
+    # and permessage-deflate shrinks the repetitive telemetry JSON on the wire
+    start_server = websockets.serve(handle_client, host, port,
+                                    ping_interval=20, ping_timeout=20,
+                                    compression='deflate')
     
     logger.info("Server started successfully")
     asyncio.get_event_loop().run_until_complete(start_server)
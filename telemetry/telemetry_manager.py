@@ -3,7 +3,26 @@ Telemetry Manager
 - Handles iRacing SDK (Windows) or stub (Mac)
 - Collects and sends telemetry data
 """
+import asyncio
+import collections
+import json
 import platform
+import threading
+
+# Serialize straight to bytes; the network layer sends bytes without re-encoding
+try:
+    from orjson import dumps as _dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, default=str).encode()
+
+# update() only appends to a ring; a drain thread ships it in batches
+TELEMETRY_RING_SIZE = 4096
+DRAIN_INTERVAL = 0.01  # seconds
+DRAIN_MAX_ITEMS = 256
+
+def _noop(*args, **kwargs):
+    pass
 
 class TelemetryManager:
     def __init__(self, config, os_type, logger=None):
@@ -11,6 +30,12 @@ class TelemetryManager:
         self.os_type = os_type
         self.logger = logger
         self.active = False
+        self.network = None
+        self._send = None
+        self._ring = collections.deque(maxlen=TELEMETRY_RING_SIZE)
+        self._drain_stop = threading.Event()
+        self._drain_thread = None
+        self.update_rate = self.config.get('telemetry', {}).get('update_rate', 2)
         if self.os_type == "Windows":
             try:
                 import irsdk
@@ -24,43 +49,81 @@ class TelemetryManager:
         else:
             self.irsdk = None
 
+    def attach_network(self, network):
+        """Route telemetry to network, caching its bound batch send for the drain thread"""
+        self.network = network
+        self._send = network.send_telemetry_batch if network else None
+
     def start(self):
         if self.logger:
             self.logger.info(f"[Telemetry] Starting for {self.os_type}...")
         self.active = True
+        # Resolve logging once: disabled levels become no-ops on the hot path
+        log = self.logger
+        self._log_debug = log.debug if log and log.is_enabled_for("debug") else _noop
+        self._log_info = log.info if log and log.is_enabled_for("info") else _noop
+        self._log_error = log.error if log and log.is_enabled_for("error") else _noop
+        self._stub_payload = b'{"stub_telemetry": true, "timestamp": 0}'
+        if self._drain_thread is None or not self._drain_thread.is_alive():
+            self._drain_stop.clear()
+            self._drain_thread = threading.Thread(target=self._drain, daemon=True)
+            self._drain_thread.start()
         # Windows: connect to iRacing SDK
         # Mac: stub only
+        # The platform never changes, so pick the update path once instead of per tick
+        self.update = self._update_windows if (self.os_type == "Windows" and self.irsdk) else self._update_stub
 
     def update(self):
+        # Replaced in start() by the platform-specific variant below
+        if not self.active:
+            return
+
+    def _update_windows(self):
         if not self.active:
             return
         try:
-            if self.os_type == "Windows" and self.irsdk:
-                # Example: get session info or telemetry packet
-                data = str(self.irsdk.get_session_info())
-            else:
-                data = '{"stub_telemetry": true, "timestamp": 0}'
-            if hasattr(self, 'network') and self.network and self.network.connected:
-                sent = self.network.send_telemetry(data)
-                if self.logger:
-                    if sent:
-                        self.logger.info("[Telemetry] Telemetry sent to backend.")
-                    else:
-                        self.logger.error("[Telemetry] Failed to send telemetry to backend.")
+            # Example: get session info or telemetry packet
+            self._ring.append(_dumps(self.irsdk.get_session_info()))
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"[Telemetry] Exception during update: {e}")
-        if self.irsdk:
-            # TODO: Read and send telemetry
-            if self.logger:
-                self.logger.debug("[Telemetry] Reading real telemetry data.")
-            pass
-        else:
-            # Stub: print fake data
-            if self.logger:
-                self.logger.debug("[Telemetry] (stub) No real telemetry on this platform.")
+            self._log_error(f"[Telemetry] Exception during update: {e}")
+        # TODO: Read and send telemetry
+        self._log_debug("[Telemetry] Reading real telemetry data.")
+
+    def _update_stub(self):
+        if not self.active:
+            return
+        self._ring.append(self._stub_payload)
+        # Stub: print fake data
+        self._log_debug("[Telemetry] (stub) No real telemetry on this platform.")
+
+    def _drain(self):
+        """Ship buffered samples to the backend, one batch per wakeup"""
+        ring = self._ring
+        while not self._drain_stop.wait(DRAIN_INTERVAL):
+            if not ring or self._send is None or not self.network.connected:
+                continue
+            batch = []
+            while ring and len(batch) < DRAIN_MAX_ITEMS:
+                batch.append(ring.popleft())
+            try:
+                sent = self._send(batch)
+            except Exception as e:
+                sent = False
+                self._log_error(f"[Telemetry] Exception during send: {e}")
+            if sent:
+                self._log_info(f"[Telemetry] Sent {len(batch)} samples to backend.")
+            else:
+                self._log_error("[Telemetry] Failed to send telemetry to backend.")
+
+    async def run(self):
+        """Poll telemetry at the configured rate until stopped"""
+        interval = 1.0 / self.update_rate
+        while self.active:
+            self.update()
+            await asyncio.sleep(interval)
 
     def stop(self):
         if self.logger:
             self.logger.info("[Telemetry] Stopping...")
         self.active = False
+        self._drain_stop.set()
@@ -1,20 +1,80 @@
+# UI module
 """
 Audio Device Selector UI Stub
 - Lists available audio input/output devices
 - Allows user to select devices
 - Integrates with config and voice manager
+- Caches PortAudio device enumeration, which can take hundreds of ms on Windows
 """
-import sounddevice as sd
+import threading
+import time
+
+DEVICE_CACHE_TTL = 5.0  # seconds
+
+_device_cache = {"ts": 0.0, "devices": None, "in_idx": {}, "out_idx": {}}
+# Enumeration may be warmed from a background thread while the UI thread also asks
+_device_lock = threading.Lock()
+
+def _get_devices(ttl=DEVICE_CACHE_TTL):
+    """Return the cached device list, re-enumerating once it is older than ttl"""
+    with _device_lock:
+        if _device_cache["devices"] is None or time.monotonic() - _device_cache["ts"] >= ttl:
+            # Deferred: importing sounddevice initializes PortAudio
+            import sounddevice as sd
+            devices = sd.query_devices()
+            _device_cache["in_idx"] = {d['name']: i for i, d in enumerate(devices) if d['max_input_channels'] > 0}
+            _device_cache["out_idx"] = {d['name']: i for i, d in enumerate(devices) if d['max_output_channels'] > 0}
+            _device_cache["devices"] = devices
+            _device_cache["ts"] = time.monotonic()
+        return _device_cache["devices"]
+
+_instance = None
 
 class AudioDeviceSelector:
     def __init__(self, config):
         self.config = config
 
+    @classmethod
+    def get(cls, config):
+        """Process-wide selector, so every caller shares one device enumeration"""
+        global _instance
+        if _instance is None:
+            _instance = cls(config)
+        else:
+            _instance.config = config
+        return _instance
+
+    def refresh(self):
+        """Drop the cached enumeration so the next lookup re-queries PortAudio"""
+        _device_cache["devices"] = None
+
     def list_input_devices(self):
-        return [d['name'] for d in sd.query_devices() if d['max_input_channels'] > 0]
+        _get_devices()
+        return list(_device_cache["in_idx"])
 
     def list_output_devices(self):
-        return [d['name'] for d in sd.query_devices() if d['max_output_channels'] > 0]
+        _get_devices()
+        return list(_device_cache["out_idx"])
+
+    def get_input_index(self, device_name):
+        return self._lookup("in_idx", device_name)
+
+    def get_output_index(self, device_name):
+        return self._lookup("out_idx", device_name)
+
+    def get_device_info(self, index):
+        """Cached query_devices() record for index (latencies, channel counts)"""
+        return _get_devices(ttl=float('inf'))[index]
+
+    def _lookup(self, key, device_name):
+        """Resolve a name from the existing enumeration; re-query only for unknown names"""
+        _get_devices(ttl=float('inf'))
+        try:
+            return _device_cache[key][device_name]
+        except KeyError:
+            self.refresh()
+            _get_devices()
+            return _device_cache[key][device_name]
 
     def set_input_device(self, device_name):
         self.config['voice']['input_device'] = device_name
@@ -3,28 +3,56 @@ Config Panel UI (cross-platform, minimal)
 - Allows user to view/edit API keys, select audio devices, and customize keybindings
 - Uses Tkinter for native cross-platform support (can be swapped for Tauri/Electron later)
 """
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from config.config_manager import load_config, save_config
 from ui.audio_device_selector import AudioDeviceSelector
 from ui.keybinding_manager import KeybindingManager
 
-import requests
-import sounddevice as sd
+import numpy as np
 from logger import Logger
 
+# requests, sounddevice and websocket-client are imported on first use (on the
+# test workers) so the panel can paint before PortAudio/urllib3 initialize
+
+TEST_TONE_RATE = 44100
+# 100 ms, 440 Hz at low amplitude, built once as contiguous float32
+_TEST_TONE = (0.2 * np.sin(2 * np.pi * 440 * np.arange(TEST_TONE_RATE // 10) / TEST_TONE_RATE)).astype(np.float32)
+
 class ConfigPanel:
     def __init__(self, root):
         self.root = root
         self.root.title("Blackbox Driver Config Panel")
         self.config = load_config()
-        self.audio_selector = AudioDeviceSelector(self.config)
+        self.audio_selector = AudioDeviceSelector.get(self.config)
         self.keybinding_manager = KeybindingManager(self.config)
         self.logger = Logger(level="info", to_file=True)
         self.status_var = tk.StringVar()
+        # Network/device tests block for seconds, so they run off the Tk thread
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self._http = None
+        self._http_lock = threading.Lock()
+        self._scheme_handlers = {
+            'ws': self._do_test_ws_backend,
+            'wss': self._do_test_ws_backend,
+            'http': self._do_test_http_backend,
+            'https': self._do_test_http_backend,
+        }
+        self.root.protocol('WM_DELETE_WINDOW', self.close)
+        # Warm the device cache while the window is being built
+        threading.Thread(target=self.audio_selector.list_input_devices, daemon=True).start()
         self.build_ui()
 
     def build_ui(self):
+        # Sub-dicts are created if missing, so save() can write into them directly
+        api_keys = self.config.setdefault('api_keys', {})
+        voice = self.config.setdefault('voice', {})
+        keybindings = self.config.setdefault('keybindings', {})
+        network = self.config.setdefault('network', {})
+
         tab_control = ttk.Notebook(self.root)
         tab_api = ttk.Frame(tab_control)
         tab_audio = ttk.Frame(tab_control)
@@ -38,48 +66,49 @@ class ConfigPanel:
 
         # API Keys Tab
         ttk.Label(tab_api, text="ElevenLabs API Key:").pack(anchor='w')
-        self.elevenlabs_var = tk.StringVar(value=self.config.get('api_keys', {}).get('elevenlabs', ''))
+        self.elevenlabs_var = tk.StringVar(value=api_keys.get('elevenlabs', ''))
         tk.Entry(tab_api, textvariable=self.elevenlabs_var, width=50).pack(anchor='w')
-        ttk.Button(tab_api, text="Test", command=self.test_elevenlabs_key).pack(anchor='w', pady=2)
+        self.elevenlabs_test_btn = ttk.Button(tab_api, text="Test", command=self.test_elevenlabs_key)
+        self.elevenlabs_test_btn.pack(anchor='w', pady=2)
         ttk.Label(tab_api, text="Deepgram API Key:").pack(anchor='w')
-        self.deepgram_var = tk.StringVar(value=self.config.get('api_keys', {}).get('deepgram', ''))
+        self.deepgram_var = tk.StringVar(value=api_keys.get('deepgram', ''))
         tk.Entry(tab_api, textvariable=self.deepgram_var, width=50).pack(anchor='w')
-        ttk.Button(tab_api, text="Test", command=self.test_deepgram_key).pack(anchor='w', pady=2)
+        self.deepgram_test_btn = ttk.Button(tab_api, text="Test", command=self.test_deepgram_key)
+        self.deepgram_test_btn.pack(anchor='w', pady=2)
 
         # Audio Devices Tab
         ttk.Label(tab_audio, text="Input Device:").pack(anchor='w')
-        self.input_device_var = tk.StringVar(value=self.config['voice'].get('input_device', 'default'))
-        input_devices = self.audio_selector.list_input_devices()
-        self.input_combo = ttk.Combobox(tab_audio, textvariable=self.input_device_var, values=input_devices, width=50)
+        self.input_device_var = tk.StringVar(value=voice.get('input_device', 'default'))
+        # Device lists are filled when a dropdown opens, not while the panel is built
+        self.input_combo = ttk.Combobox(tab_audio, textvariable=self.input_device_var,
+                                        values=[self.input_device_var.get()], width=50,
+                                        postcommand=self._populate_input_devices)
         self.input_combo.pack(anchor='w')
-        ttk.Button(tab_audio, text="Test Input Device", command=self.test_input_device).pack(anchor='w', pady=2)
+        self.input_test_btn = ttk.Button(tab_audio, text="Test Input Device", command=self.test_input_device)
+        self.input_test_btn.pack(anchor='w', pady=2)
         ttk.Label(tab_audio, text="Output Device:").pack(anchor='w')
-        self.output_device_var = tk.StringVar(value=self.config['voice'].get('output_device', 'default'))
-        output_devices = self.audio_selector.list_output_devices()
-        self.output_combo = ttk.Combobox(tab_audio, textvariable=self.output_device_var, values=output_devices, width=50)
+        self.output_device_var = tk.StringVar(value=voice.get('output_device', 'default'))
+        self.output_combo = ttk.Combobox(tab_audio, textvariable=self.output_device_var,
+                                         values=[self.output_device_var.get()], width=50,
+                                         postcommand=self._populate_output_devices)
         self.output_combo.pack(anchor='w')
-        ttk.Button(tab_audio, text="Test Output Device", command=self.test_output_device).pack(anchor='w', pady=2)
+        self.output_test_btn = ttk.Button(tab_audio, text="Test Output Device", command=self.test_output_device)
+        self.output_test_btn.pack(anchor='w', pady=2)
+        ttk.Button(tab_audio, text="Refresh Devices", command=self.refresh_devices).pack(anchor='w', pady=2)
 
-        # Keybindings Tab
-        self.key_vars = {}
-        self.binding_buttons = {}
+        # Keybindings Tab: one native Treeview row per action, keys stored in the row values
         self.waiting_for_key = None
+        self.keys_tree = ttk.Treeview(tab_keys, columns=('key',), show='tree headings',
+                                      height=max(len(keybindings), 1), selectmode='browse')
+        self.keys_tree.heading('#0', text='Action')
+        self.keys_tree.heading('key', text='Key')
+        for action, key in keybindings.items():
+            self.keys_tree.insert('', 'end', iid=action, text=action.replace('_', ' ').title(), values=(key,))
+        self.keys_tree.pack(anchor='w', fill='x', pady=2)
+        self.keys_tree.bind('<Double-1>', self.start_key_binding_from_tree)
         
-        for action, key in self.config.get('keybindings', {}).items():
-            frame = tk.Frame(tab_keys)
-            frame.pack(anchor='w', fill='x', pady=2)
-            
-            ttk.Label(frame, text=f"{action.replace('_',' ').title()}:", width=20).pack(side='left')
-            
-            var = tk.StringVar(value=key)
-            self.key_vars[action] = var
-            
-            key_label = tk.Label(frame, textvariable=var, width=10, relief='sunken', bg='white')
-            key_label.pack(side='left', padx=5)
-            
-            bind_btn = ttk.Button(frame, text="Bind Key", command=lambda a=action: self.start_key_binding(a))
-            bind_btn.pack(side='left', padx=5)
-            self.binding_buttons[action] = bind_btn
+        self.bind_button = ttk.Button(tab_keys, text="Bind Key", command=self.start_key_binding_from_tree)
+        self.bind_button.pack(anchor='w', pady=2)
         
         # Bind key capture to the entire window
         self.root.bind('<KeyPress>', self.on_key_press)
@@ -87,137 +116,209 @@ class ConfigPanel:
 
         # Network Tab
         ttk.Label(tab_network, text="Backend Server URL:").pack(anchor='w')
-        self.server_url_var = tk.StringVar(value=self.config.get('network', {}).get('server_url', ''))
+        self.server_url_var = tk.StringVar(value=network.get('server_url', ''))
         tk.Entry(tab_network, textvariable=self.server_url_var, width=50).pack(anchor='w')
         ttk.Label(tab_network, text="Backend API Key:").pack(anchor='w')
-        self.backend_api_key_var = tk.StringVar(value=self.config.get('network', {}).get('api_key', ''))
+        self.backend_api_key_var = tk.StringVar(value=network.get('api_key', ''))
         tk.Entry(tab_network, textvariable=self.backend_api_key_var, width=50).pack(anchor='w')
-        ttk.Button(tab_network, text="Test Connection", command=self.test_backend_connection).pack(anchor='w', pady=2)
+        self.backend_test_btn = ttk.Button(tab_network, text="Test Connection", command=self.test_backend_connection)
+        self.backend_test_btn.pack(anchor='w', pady=2)
 
         # Status Label
         ttk.Label(self.root, textvariable=self.status_var, foreground="blue").pack(side='bottom', pady=2)
         # Save Button
         ttk.Button(self.root, text="Save Settings", command=self.save).pack(side='bottom', pady=10)
 
+        # Run Tk's geometry pass once for the whole panel
+        self.root.update_idletasks()
+
     def set_status(self, msg, error=False):
-        self.status_var.set(msg)
+        # Skip the Tcl variable trace and redraw when the text is unchanged
+        if self.status_var.get() != msg:
+            self.status_var.set(msg)
         if error:
             self.logger.error(msg)
         else:
             self.logger.info(msg)
 
+    def _report(self, msg, error=False, modal=None):
+        """Show a test result in the status bar and, unless disabled, a dialog"""
+        self.set_status(msg, error)
+        if modal is None:
+            modal = self.config.get('ui', {}).get('modal_test_results', True)
+        if modal:
+            # Let the status bar paint before the modal grabs the event loop
+            show = messagebox.showerror if error else messagebox.showinfo
+            self.root.after_idle(show, "Test Result", msg)
+
+    def _get_http(self):
+        """One pooled session so repeated tests reuse TCP/TLS connections"""
+        with self._http_lock:
+            if self._http is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self._http = requests.Session()
+                self._http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+                self._http.headers.update({'User-Agent': 'blackbox-config/1.0'})
+            return self._http
+
+    def _run_test(self, button, test, *args):
+        """Run a blocking test in the worker pool and report back on the Tk thread"""
+        button.config(state='disabled')
+        future = self._executor.submit(test, *args)
+        future.add_done_callback(lambda f: self.root.after(0, self._show_result, button, f))
+
+    def _show_result(self, button, future):
+        button.config(state='normal')
+        try:
+            ok, msg = future.result()
+        except Exception as e:
+            ok, msg = False, f"Test failed: {e}"
+        self._report(msg, error=not ok)
+
     def test_elevenlabs_key(self):
-        key = self.elevenlabs_var.get()
+        self._run_test(self.elevenlabs_test_btn, self._do_test_elevenlabs_key, self.elevenlabs_var.get())
+
+    def _do_test_elevenlabs_key(self, key):
         try:
-            resp = requests.get(
+            resp = self._get_http().get(
                 "https://api.elevenlabs.io/v1/user",
                 headers={"xi-api-key": key}, timeout=5)
             if resp.status_code == 200:
-                self.set_status("ElevenLabs key is valid.")
-                messagebox.showinfo("Test Result", "ElevenLabs key is valid.")
-            else:
-                self.set_status("ElevenLabs key invalid or not authorized.", error=True)
-                messagebox.showerror("Test Result", "ElevenLabs key invalid or not authorized.")
+                return True, "ElevenLabs key is valid."
+            return False, "ElevenLabs key invalid or not authorized."
         except Exception as e:
-            self.set_status(f"Error testing ElevenLabs key: {e}", error=True)
-            messagebox.showerror("Test Result", f"Error testing ElevenLabs key: {e}")
+            return False, f"Error testing ElevenLabs key: {e}"
 
     def test_deepgram_key(self):
-        key = self.deepgram_var.get()
+        self._run_test(self.deepgram_test_btn, self._do_test_deepgram_key, self.deepgram_var.get())
+
+    def _do_test_deepgram_key(self, key):
         if not key or len(key) < 10:
-            self.set_status("Deepgram key missing or too short.", error=True)
-            messagebox.showerror("Test Result", "Deepgram key missing or too short.")
-            return
+            return False, "Deepgram key missing or too short."
         
         try:
             # Test Deepgram API key with a simple request
-            resp = requests.get(
+            resp = self._get_http().get(
                 "https://api.deepgram.com/v1/projects",
                 headers={"Authorization": f"Token {key}"}, timeout=5)
             if resp.status_code == 200:
-                self.set_status("Deepgram key is valid.")
-                messagebox.showinfo("Test Result", "Deepgram key is valid.")
-            else:
-                self.set_status("Deepgram key invalid or not authorized.", error=True)
-                messagebox.showerror("Test Result", "Deepgram key invalid or not authorized.")
+                return True, "Deepgram key is valid."
+            return False, "Deepgram key invalid or not authorized."
         except Exception as e:
-            self.set_status(f"Error testing Deepgram key: {e}", error=True)
-            messagebox.showerror("Test Result", f"Error testing Deepgram key: {e}")
+            return False, f"Error testing Deepgram key: {e}"
+
+    def _populate_input_devices(self):
+        self.input_combo.configure(values=self.audio_selector.list_input_devices())
+
+    def _populate_output_devices(self):
+        self.output_combo.configure(values=self.audio_selector.list_output_devices())
+
+    def refresh_devices(self):
+        self.audio_selector.refresh()
+        self._populate_input_devices()
+        self._populate_output_devices()
+        self.set_status("Audio device list refreshed.")
 
     def test_input_device(self):
-        device = self.input_device_var.get()
+        self._run_test(self.input_test_btn, self._do_test_input_device, self.input_device_var.get())
+
+    def _do_test_input_device(self, device):
         try:
-            idx = [d['name'] for d in sd.query_devices() if d['max_input_channels'] > 0].index(device)
-            with sd.InputStream(device=idx):
-                self.set_status(f"Input device '{device}' is available.")
-                messagebox.showinfo("Test Result", f"Input device '{device}' is available.")
+            idx = self.audio_selector.get_input_index(device)
+            latency = self.audio_selector.get_device_info(idx)['default_low_input_latency']
+            import sounddevice as sd
+            with sd.InputStream(device=idx, latency=latency, blocksize=0):
+                return True, f"Input device '{device}' is available."
         except Exception as e:
-            self.set_status(f"Error testing input device: {e}", error=True)
-            messagebox.showerror("Test Result", f"Error testing input device: {e}")
+            return False, f"Error testing input device: {e}"
 
     def test_output_device(self):
-        device = self.output_device_var.get()
+        self._run_test(self.output_test_btn, self._do_test_output_device, self.output_device_var.get())
+
+    def _do_test_output_device(self, device):
         try:
-            idx = [d['name'] for d in sd.query_devices() if d['max_output_channels'] > 0].index(device)
-            sd.play([0]*1000, samplerate=44100, device=idx)
-            self.set_status(f"Output device '{device}' is available (played test sound).")
-            messagebox.showinfo("Test Result", f"Output device '{device}' is available (played test sound).")
+            idx = self.audio_selector.get_output_index(device)
+            latency = self.audio_selector.get_device_info(idx)['default_low_output_latency']
+            import sounddevice as sd
+            with sd.OutputStream(device=idx, samplerate=TEST_TONE_RATE, channels=1,
+                                 latency=latency, blocksize=0) as stream:
+                stream.write(_TEST_TONE)
+            return True, f"Output device '{device}' is available (played test sound)."
         except Exception as e:
-            self.set_status(f"Error testing output device: {e}", error=True)
-            messagebox.showerror("Test Result", f"Error testing output device: {e}")
+            return False, f"Error testing output device: {e}"
 
     def test_backend_connection(self):
         url = self.server_url_var.get()
-        api_key = self.backend_api_key_var.get()
         if not url:
-            self.set_status("Backend server URL is required.", error=True)
-            messagebox.showerror("Test Result", "Backend server URL is required.")
+            self._report("Backend server URL is required.", error=True)
             return
-        
+        handler = self._scheme_handlers.get(urlparse(url).scheme)
+        if handler is None:
+            self._report("Unknown backend URL scheme. Use ws:// or http://", error=True)
+            return
+        self._run_test(self.backend_test_btn, handler, url, self.backend_api_key_var.get())
+
+    def _do_test_ws_backend(self, url, api_key):
+        try:
+            import websocket
+        except ImportError:
+            return False, "websocket-client is not installed."
         try:
-            if url.startswith('ws'):
-                import websocket
-                headers = []
-                if api_key:
-                    headers.append(f"Authorization: Bearer {api_key}")
-                ws = websocket.create_connection(url, header=headers, timeout=5)
-                ws.close()
-                self.set_status("Backend WebSocket connection successful.")
-                messagebox.showinfo("Test Result", "Backend WebSocket connection successful.")
-            elif url.startswith('http'):
-                headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
-                resp = requests.get(url, headers=headers, timeout=5)
-                if resp.status_code == 200:
-                    self.set_status("Backend HTTP connection successful.")
-                    messagebox.showinfo("Test Result", "Backend HTTP connection successful.")
-                else:
-                    self.set_status(f"Backend HTTP connection failed: {resp.status_code}", error=True)
-                    messagebox.showerror("Test Result", f"Backend HTTP connection failed: {resp.status_code}")
-            else:
-                self.set_status("Unknown backend URL scheme. Use ws:// or http://", error=True)
-                messagebox.showerror("Test Result", "Unknown backend URL scheme. Use ws:// or http://")
+            headers = []
+            if api_key:
+                headers.append(f"Authorization: Bearer {api_key}")
+            ws = websocket.create_connection(url, header=headers, timeout=5)
+            ws.close()
+            return True, "Backend WebSocket connection successful."
         except Exception as e:
-            self.set_status(f"Backend connection failed: {e}", error=True)
-            messagebox.showerror("Test Result", f"Backend connection failed: {e}")
+            return False, f"Backend connection failed: {e}"
+
+    def _do_test_http_backend(self, url, api_key):
+        try:
+            headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+            resp = self._get_http().get(url, headers=headers, timeout=5)
+            if resp.status_code == 200:
+                return True, "Backend HTTP connection successful."
+            return False, f"Backend HTTP connection failed: {resp.status_code}"
+        except Exception as e:
+            return False, f"Backend connection failed: {e}"
 
     def save(self):
         # Update config from UI
-        self.config['api_keys']['elevenlabs'] = self.elevenlabs_var.get()
-        self.config['api_keys']['deepgram'] = self.deepgram_var.get()
-        self.config['voice']['input_device'] = self.input_device_var.get()
-        self.config['voice']['output_device'] = self.output_device_var.get()
-        self.config['network']['server_url'] = self.server_url_var.get()
-        self.config['network']['api_key'] = self.backend_api_key_var.get()
-        for action, var in self.key_vars.items():
-            self.config['keybindings'][action] = var.get()
+        api_keys = self.config.setdefault('api_keys', {})
+        api_keys['elevenlabs'] = self.elevenlabs_var.get()
+        api_keys['deepgram'] = self.deepgram_var.get()
+        voice = self.config.setdefault('voice', {})
+        voice['input_device'] = self.input_device_var.get()
+        voice['output_device'] = self.output_device_var.get()
+        network = self.config.setdefault('network', {})
+        network['server_url'] = self.server_url_var.get()
+        network['api_key'] = self.backend_api_key_var.get()
+        keybindings = self.config.setdefault('keybindings', {})
+        for action in self.keys_tree.get_children():
+            keybindings[action] = self.keys_tree.set(action, 'key')
         save_config(self.config)
         self.set_status("Settings saved.")
         messagebox.showinfo("Settings Saved", "Your settings have been saved.")
     
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._http is not None:
+            self._http.close()
+        self.root.destroy()
+    
+    def start_key_binding_from_tree(self, event=None):
+        """Bind the focused Treeview row; shared by the button and double-click"""
+        self.start_key_binding(self.keys_tree.focus())
+    
     def start_key_binding(self, action):
         """Start waiting for a key press to bind to the given action"""
+        if not action:
+            self.set_status("Select an action to bind.")
+            return
         self.waiting_for_key = action
-        self.binding_buttons[action].config(text="Press any key...", state='disabled')
+        self.bind_button.config(text="Press any key...", state='disabled')
         self.set_status(f"Press any key to bind to '{action.replace('_', ' ').title()}'...")
         self.root.focus_set()  # Ensure window has focus for key capture
     
@@ -237,17 +338,18 @@ class ConfigPanel:
         
         # Update the binding
         action = self.waiting_for_key
-        self.key_vars[action].set(key)
+        if self.keys_tree.set(action, 'key') != key:
+            self.keys_tree.set(action, 'key', key)
         
         # Reset UI
-        self.binding_buttons[action].config(text="Bind Key", state='normal')
+        self.bind_button.config(text="Bind Key", state='normal')
         self.set_status(f"Bound '{key}' to '{action.replace('_', ' ').title()}'")
         self.waiting_for_key = None
     
     def cancel_key_binding(self):
         """Cancel the current key binding operation"""
         if self.waiting_for_key:
-            self.binding_buttons[self.waiting_for_key].config(text="Bind Key", state='normal')
+            self.bind_button.config(text="Bind Key", state='normal')
             self.set_status("Key binding cancelled.")
             self.waiting_for_key = None
 
@@ -8,11 +8,19 @@ Minimal, racing-focused overlay for drivers during races
 - Non-intrusive design
 """
 
+import asyncio
+import collections
 import tkinter as tk
 from tkinter import ttk
+import queue
 import threading
 import time
-from datetime import datetime
+
+GEAR_TEXT = {-1: "R", 0: "N"}
+UPDATE_PERIOD = 0.5  # seconds between display refreshes
+MINIMIZED_PERIOD_MS = 2000  # only the connection status is checked while minimized
+TELEMETRY_POLL_INTERVAL = 0.05  # seconds between background telemetry reads
+CONVERSATION_LOG_SIZE = 100  # team radio entries kept in memory
 
 class DriverOverlay:
     def __init__(self, config, telemetry_manager, voice_manager, network_manager, logger=None):
@@ -28,13 +36,23 @@ class DriverOverlay:
         self.is_recording = False
         self.minimized = False
         
-        # Telemetry data
-        self.current_data = {}
-        self.last_update = time.time()
+        # Set when the network reports a connect/disconnect; starts dirty for the first paint
+        self._conn_dirty = True
+        self._conn_events = False
+        self._tick_id = None
+        # Formatted telemetry frames from the poll thread; latest wins
+        self._render_q = queue.Queue(maxsize=1)
+        # Last text pushed to each label, so unchanged values skip configure()
+        self._last_text = {}
+        self._last_sec = None
+        # Recent update_loop durations, used to keep the refresh period steady
+        self._delays = collections.deque(maxlen=20)
         
         # Voice state
         self.ptt_key = config.get('voice', {}).get('ptt_key', 'space')
-        self.conversation_log = []
+        self.conversation_log = collections.deque(maxlen=CONVERSATION_LOG_SIZE)
+        self._log_listeners = []
+        self._recording_listeners = []
         
     def start(self):
         """Initialize and show the driver overlay"""
@@ -42,6 +60,11 @@ class DriverOverlay:
             self.logger.info("[DriverOverlay] Starting driver interface...")
             
         self.active = True
+        if self.network_manager and hasattr(self.network_manager, 'on_status_change'):
+            self.network_manager.on_status_change(self._on_conn_change)
+            self._conn_events = True
+        if self.telemetry_manager:
+            threading.Thread(target=self._poll_telem, daemon=True).start()
         self.create_overlay()
         
     def create_overlay(self):
@@ -50,6 +73,8 @@ class DriverOverlay:
         self.root.title("BLACKBOX DRIVER")
         self.root.geometry("400x300")
         self.root.configure(bg='#000000')
+        # Screen size is queried once; winfo_* calls are Tcl round trips
+        self._screen_w = self.root.winfo_screenwidth()
         
         # Make window always on top but not intrusive
         self.root.attributes('-topmost', True)
@@ -57,15 +82,28 @@ class DriverOverlay:
         
         # Position in top-right corner
         self.root.geometry("+{}+{}".format(
-            self.root.winfo_screenwidth() - 420, 20
+            self._screen_w - 420, 20
         ))
         
+        self.create_styles()
         self.create_main_interface()
         self.setup_keybindings()
         
         # Start update loop
         self.update_loop()
         
+    def create_styles(self):
+        """Shared ttk styles, so each font and color is allocated once"""
+        style = ttk.Style(self.root)
+        style.configure('TelemCaption.TLabel', background='#000000', foreground='#888888',
+                        font=('Arial', 8))
+        style.configure('Telem.TLabel', background='#000000', foreground='#ffffff',
+                        font=('Arial', 8, 'bold'))
+        style.configure('TelemGear.TLabel', background='#000000', foreground='#00ff41',
+                        font=('Arial', 8, 'bold'))
+        style.configure('TelemPos.TLabel', background='#000000', foreground='#ffff00',
+                        font=('Arial', 8, 'bold'))
+        
     def create_main_interface(self):
         """Create the main driver interface"""
         # Header with minimize/close
@@ -101,62 +139,24 @@ class DriverOverlay:
                                    fg='#00ff41', bg='#000000')
         telem_frame.pack(fill='x', pady=5)
         
-        # Create telemetry labels
+        # Create telemetry labels, each driven by a StringVar
         self.telem_labels = {}
-        
-        # Row 1: Speed, RPM
-        row1 = tk.Frame(telem_frame, bg='#000000')
-        row1.pack(fill='x', padx=5, pady=2)
-        
-        tk.Label(row1, text="SPEED:", font=('Arial', 8), 
-                fg='#888888', bg='#000000').pack(side='left')
-        self.telem_labels['speed'] = tk.Label(row1, text="--- mph", 
-                                            font=('Arial', 8, 'bold'),
-                                            fg='#ffffff', bg='#000000')
-        self.telem_labels['speed'].pack(side='left', padx=(5, 20))
-        
-        tk.Label(row1, text="RPM:", font=('Arial', 8), 
-                fg='#888888', bg='#000000').pack(side='left')
-        self.telem_labels['rpm'] = tk.Label(row1, text="---- rpm", 
-                                          font=('Arial', 8, 'bold'),
-                                          fg='#ffffff', bg='#000000')
-        self.telem_labels['rpm'].pack(side='left', padx=5)
-        
-        # Row 2: Gear, Fuel
-        row2 = tk.Frame(telem_frame, bg='#000000')
-        row2.pack(fill='x', padx=5, pady=2)
-        
-        tk.Label(row2, text="GEAR:", font=('Arial', 8), 
-                fg='#888888', bg='#000000').pack(side='left')
-        self.telem_labels['gear'] = tk.Label(row2, text="-", 
-                                           font=('Arial', 8, 'bold'),
-                                           fg='#00ff41', bg='#000000')
-        self.telem_labels['gear'].pack(side='left', padx=(5, 20))
-        
-        tk.Label(row2, text="FUEL:", font=('Arial', 8), 
-                fg='#888888', bg='#000000').pack(side='left')
-        self.telem_labels['fuel'] = tk.Label(row2, text="-- L", 
-                                           font=('Arial', 8, 'bold'),
-                                           fg='#ffffff', bg='#000000')
-        self.telem_labels['fuel'].pack(side='left', padx=5)
-        
-        # Row 3: Position, Gap
-        row3 = tk.Frame(telem_frame, bg='#000000')
-        row3.pack(fill='x', padx=5, pady=2)
-        
-        tk.Label(row3, text="POS:", font=('Arial', 8), 
-                fg='#888888', bg='#000000').pack(side='left')
-        self.telem_labels['position'] = tk.Label(row3, text="--", 
-                                                font=('Arial', 8, 'bold'),
-                                                fg='#ffff00', bg='#000000')
-        self.telem_labels['position'].pack(side='left', padx=(5, 20))
-        
-        tk.Label(row3, text="GAP:", font=('Arial', 8), 
-                fg='#888888', bg='#000000').pack(side='left')
-        self.telem_labels['gap'] = tk.Label(row3, text="+-.---", 
-                                          font=('Arial', 8, 'bold'),
-                                          fg='#ffffff', bg='#000000')
-        self.telem_labels['gap'].pack(side='left', padx=5)
+        self.telem_vars = {}
+        
+        # Rows of (caption, key, placeholder, value style)
+        rows = (
+            (("SPEED:", 'speed', "--- mph", 'Telem.TLabel'), ("RPM:", 'rpm', "---- rpm", 'Telem.TLabel')),
+            (("GEAR:", 'gear', "-", 'TelemGear.TLabel'), ("FUEL:", 'fuel', "-- L", 'Telem.TLabel')),
+            (("POS:", 'position', "--", 'TelemPos.TLabel'), ("GAP:", 'gap', "+-.---", 'Telem.TLabel')),
+        )
+        for row_fields in rows:
+            row = tk.Frame(telem_frame, bg='#000000')
+            row.pack(fill='x', padx=5, pady=2)
+            for i, (caption, key, placeholder, style) in enumerate(row_fields):
+                ttk.Label(row, text=caption, style='TelemCaption.TLabel').pack(side='left')
+                self.telem_vars[key] = tk.StringVar(value=placeholder)
+                self.telem_labels[key] = ttk.Label(row, textvariable=self.telem_vars[key], style=style)
+                self.telem_labels[key].pack(side='left', padx=(5, 20) if i == 0 else 5)
         
     def create_voice_interface(self):
         """Create compact voice communication interface"""
@@ -216,14 +216,17 @@ class DriverOverlay:
         
     def setup_keybindings(self):
         """Setup keyboard shortcuts"""
-        self.root.bind('<KeyPress-space>', self.start_recording)
-        self.root.bind('<KeyRelease-space>', self.stop_recording)
+        # Key and button push-to-talk share the same two bound methods; bind_all keeps
+        # the key working whichever of our widgets or windows has focus
+        down, up = self.start_recording, self.stop_recording
+        self.root.bind_all(f'<KeyPress-{self.ptt_key}>', down)
+        self.root.bind_all(f'<KeyRelease-{self.ptt_key}>', up)
         self.root.bind('<F1>', lambda e: self.toggle_minimize())
         self.root.bind('<Escape>', lambda e: self.root.quit())
         
         # Bind PTT button events
-        self.ptt_button.bind('<Button-1>', self.start_recording)
-        self.ptt_button.bind('<ButtonRelease-1>', self.stop_recording)
+        self.ptt_button.bind('<Button-1>', down)
+        self.ptt_button.bind('<ButtonRelease-1>', up)
         
         # Make window focusable for key events
         self.root.focus_set()
@@ -234,10 +237,12 @@ class DriverOverlay:
             return
             
         self.is_recording = True
+        for callback in self._recording_listeners:
+            callback()
         
         # Update UI
         self.ptt_button.configure(bg='#ff4500', text="🔴 RECORDING... (RELEASE)")
-        self.voice_status.configure(text="RECORDING", fg='#ff4500')
+        self._set_text('voice', self.voice_status, "RECORDING", fg='#ff4500')
         
         # Start recording via voice manager
         if self.voice_manager:
@@ -248,7 +253,7 @@ class DriverOverlay:
             except Exception as e:
                 if self.logger:
                     self.logger.error(f"[DriverOverlay] Recording error: {e}")
-                self.voice_status.configure(text="ERROR", fg='#ff4444')
+                self._set_text('voice', self.voice_status, "ERROR", fg='#ff4444')
         
     def stop_recording(self, event=None):
         """Stop voice recording"""
@@ -259,7 +264,7 @@ class DriverOverlay:
         
         # Update UI
         self.ptt_button.configure(bg='#1a1a1a', text="🎙️ HOLD TO TALK (SPACE)")
-        self.voice_status.configure(text="SENDING", fg='#ffff00')
+        self._set_text('voice', self.voice_status, "SENDING", fg='#ffff00')
         
         # Stop recording and send
         if self.voice_manager:
@@ -269,9 +274,9 @@ class DriverOverlay:
                 # Send via network manager
                 if self.network_manager and audio_data:
                     self.network_manager.send_voice_data(audio_data)
-                    self.last_message.configure(text="Message sent to team")
+                    self.add_to_conversation_log("DRIVER", "Message sent to team")
                     
-                self.voice_status.configure(text="READY", fg='#00ff41')
+                self._set_text('voice', self.voice_status, "READY", fg='#00ff41')
                 
                 if self.logger:
                     self.logger.info("[DriverOverlay] Voice message sent")
@@ -279,7 +284,7 @@ class DriverOverlay:
             except Exception as e:
                 if self.logger:
                     self.logger.error(f"[DriverOverlay] Send error: {e}")
-                self.voice_status.configure(text="ERROR", fg='#ff4444')
+                self._set_text('voice', self.voice_status, "ERROR", fg='#ff4444')
         
     def toggle_minimize(self):
         """Toggle between minimized and normal view"""
@@ -288,54 +293,82 @@ class DriverOverlay:
             self.content_frame.pack(fill='both', expand=True, padx=10, pady=5)
             self.root.geometry("400x300")
             self.minimized = False
+            # Don't wait out the slow minimized tick; refresh now at the normal rate
+            if self._tick_id is not None:
+                self.root.after_cancel(self._tick_id)
+            self._tick_id = self.root.after_idle(self.update_loop)
         else:
             # Minimize
             self.content_frame.pack_forget()
             self.root.geometry("400x30")
             self.minimized = True
             
-    def update_telemetry_display(self):
-        """Update telemetry display with current data"""
-        if not self.telemetry_manager:
-            return
+    def _set_text(self, key, label, text, **options):
+        """Configure label only when its text differs from what was last rendered"""
+        if self._last_text.get(key) != text:
+            label.configure(text=text, **options)
+            self._last_text[key] = text
+            
+    def _poll_telem(self):
+        """Read and format telemetry off the Tk thread; the Tk tick only applies strings"""
+        last_error = None
+        last_values = None
+        while self.active:
+            try:
+                data = self.telemetry_manager.get_current_data()
+                if data:
+                    # Round to display precision first; unchanged readings skip formatting
+                    values = (round(data.get('speed', 0)), round(data.get('rpm', 0)),
+                              data.get('gear', 0), round(data.get('fuel_level', 0), 1),
+                              data.get('position', 0), round(data.get('gap_to_leader', 0), 3))
+                    if values != last_values:
+                        last_values = values
+                        self._publish(self._format_telemetry(*values))
+            except Exception as e:
+                # Log each distinct failure once rather than at the poll rate
+                if self.logger and str(e) != last_error:
+                    self.logger.error(f"[DriverOverlay] Telemetry poll error: {e}")
+                last_error = str(e)
+            time.sleep(TELEMETRY_POLL_INTERVAL)
+            
+    @staticmethod
+    def _format_telemetry(speed, rpm, gear, fuel, position, gap):
+        return {
+            'speed': f"{speed} mph",
+            'rpm': f"{rpm} rpm",
+            'gear': GEAR_TEXT.get(gear, str(gear)),
+            'fuel': f"{fuel:.1f} L",
+            'position': str(position),
+            'gap': f"+{gap:.3f}" if gap > 0 else "LEADER",
+        }
+        
+    def _publish(self, texts):
+        """Hand a formatted frame to the Tk thread, replacing any it has not shown yet"""
+        try:
+            self._render_q.put_nowait(texts)
+        except queue.Full:
+            try:
+                self._render_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._render_q.put_nowait(texts)
             
+    def update_telemetry_display(self):
+        """Apply the latest formatted telemetry frame, if a new one arrived"""
         try:
-            # Get current telemetry data
-            data = self.telemetry_manager.get_current_data()
+            texts = self._render_q.get_nowait()
+        except queue.Empty:
+            return
             
-            if data:
-                # Update speed
-                speed = data.get('speed', 0)
-                self.telem_labels['speed'].configure(text=f"{speed:.0f} mph")
-                
-                # Update RPM
-                rpm = data.get('rpm', 0)
-                self.telem_labels['rpm'].configure(text=f"{rpm:.0f} rpm")
-                
-                # Update gear
-                gear = data.get('gear', 0)
-                gear_text = "R" if gear == -1 else "N" if gear == 0 else str(gear)
-                self.telem_labels['gear'].configure(text=gear_text)
-                
-                # Update fuel
-                fuel = data.get('fuel_level', 0)
-                self.telem_labels['fuel'].configure(text=f"{fuel:.1f} L")
-                
-                # Update position
-                position = data.get('position', 0)
-                self.telem_labels['position'].configure(text=str(position))
-                
-                # Update gap
-                gap = data.get('gap_to_leader', 0)
-                if gap > 0:
-                    self.telem_labels['gap'].configure(text=f"+{gap:.3f}")
-                else:
-                    self.telem_labels['gap'].configure(text="LEADER")
-                    
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"[DriverOverlay] Telemetry update error: {e}")
+        for key, text in texts.items():
+            if self._last_text.get(key) != text:
+                self._last_text[key] = text
+                self.telem_vars[key].set(text)
                 
+    def _on_conn_change(self, connected):
+        # May run on a network thread; the Tk tick picks the flag up
+        self._conn_dirty = True
+        
     def update_connection_status(self):
         """Update connection status indicators"""
         try:
@@ -343,11 +376,11 @@ class DriverOverlay:
             if self.network_manager:
                 status = self.network_manager.get_status()
                 if status[0] == 'OK':
-                    self.conn_status.configure(text="● CONNECTED", fg='#00ff41')
+                    self._set_text('conn', self.conn_status, "● CONNECTED", fg='#00ff41')
                 else:
-                    self.conn_status.configure(text="● DISCONNECTED", fg='#ff4444')
+                    self._set_text('conn', self.conn_status, "● DISCONNECTED", fg='#ff4444')
             else:
-                self.conn_status.configure(text="● NO NETWORK", fg='#888888')
+                self._set_text('conn', self.conn_status, "● NO NETWORK", fg='#888888')
                 
         except Exception as e:
             if self.logger:
@@ -355,40 +388,92 @@ class DriverOverlay:
                 
     def update_time_display(self):
         """Update time display"""
-        current_time = datetime.now().strftime("%H:%M:%S")
-        self.time_label.configure(text=current_time)
+        # The text only changes once a second, so skip formatting within the same second
+        now = int(time.time())
+        if now == self._last_sec:
+            return
+        self._last_sec = now
+        self._set_text('time', self.time_label, time.strftime("%H:%M:%S", time.localtime(now)))
         
     def update_loop(self):
         """Main update loop"""
         if not self.active:
             return
             
+        if self.minimized:
+            # Nothing else is visible; let the status check wait for an idle moment
+            if self._conn_dirty or not self._conn_events:
+                self._conn_dirty = False
+                self.root.after_idle(self._run_step, self.update_connection_status)
+            self._tick_id = self.root.after(MINIMIZED_PERIOD_MS, self.update_loop)
+            return
+            
+        t0 = time.perf_counter()
         try:
             # Update displays
-            self.update_telemetry_display()
-            self.update_connection_status()
-            self.update_time_display()
-            
-            # Schedule next update
-            if self.root:
-                self.root.after(500, self.update_loop)  # Update every 500ms
+            self._run_step(self.update_telemetry_display)
+            self._run_step(self.update_time_display)
+            # Without change events, fall back to polling every tick
+            if self._conn_dirty or not self._conn_events:
+                self._conn_dirty = False
+                self._run_step(self.update_connection_status)
+            # Flush geometry/redraw once for everything changed above
+            self._run_step(self.root.update_idletasks)
+        finally:
+            # Always reschedule, shortened by the average time a tick takes
+            self._delays.append(time.perf_counter() - t0)
+            if self.root and self.active:
+                self._tick_id = self.root.after(self._next_interval_ms(), self.update_loop)
                 
+    def _run_step(self, step):
+        """Run one display update; a failure is logged without skipping the others"""
+        try:
+            step()
         except Exception as e:
             if self.logger:
-                self.logger.error(f"[DriverOverlay] Update loop error: {e}")
+                self.logger.error(f"[DriverOverlay] {step.__name__} error: {e}")
                 
+    def _next_interval_ms(self):
+        """Delay until the next tick so ticks start UPDATE_PERIOD apart"""
+        mean = sum(self._delays) / len(self._delays)
+        return max(1, int((UPDATE_PERIOD - max(min(mean, UPDATE_PERIOD - 0.001), 0)) * 1000))
+        
+    def on_log_entry(self, callback):
+        """Register callback(entry) for every new conversation log entry"""
+        self._log_listeners.append(callback)
+        
+    def on_recording_start(self, callback):
+        """Register callback() to run on the Tk thread whenever push-to-talk starts"""
+        self._recording_listeners.append(callback)
+        
+    def add_to_conversation_log(self, speaker, message):
+        """Record a team radio entry and show it as the last message"""
+        # (timestamp, speaker, message)
+        entry = (time.strftime("%H:%M:%S"), speaker, message)
+        self.conversation_log.append(entry)
+        if self.root:
+            self.last_message.configure(text=f"{speaker}: {message}")
+        for callback in self._log_listeners:
+            callback(entry)
+            
     def handle_voice_response(self, speaker, message):
         """Handle incoming voice responses from team"""
-        self.last_message.configure(text=f"{speaker}: {message}")
+        self.add_to_conversation_log(speaker, message)
         
         # Play audio response if available
         if self.voice_manager:
             self.voice_manager.play_tts_response(message)
             
     def update(self):
-        """Called by main loop"""
+        """Called by main loop; dispatches Tk timers and input events, not just idle redraws"""
         if self.root:
-            self.root.update_idletasks()
+            self.root.update()
+            
+    async def run(self, interval=0.05):
+        """Pump Tk events (after() timers, key bindings) from the asyncio main loop"""
+        while self.active:
+            self.update()
+            await asyncio.sleep(interval)
             
     def get_status(self):
         """Return current status"""
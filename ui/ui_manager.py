@@ -1,41 +1,53 @@
 """
 UI Manager
-- Handles minimal overlay, config panel, and voice communication UI
-- Provides push-to-talk interface matching team engineer HUD
+- Handles system health and team radio log windows
+- Push-to-talk and the conversation log are owned by the DriverOverlay it wraps,
+  so there is a single Tk interpreter and a single recording path
 """
 import tkinter as tk
 from tkinter import ttk
-import threading
-import time
+
+from ui.driver_overlay import CONVERSATION_LOG_SIZE
 
 class UIManager:
-    def __init__(self, config, telemetry_manager, voice_manager, network_manager, logger=None):
+    # Color coding for different speakers, applied as Text tags
+    _COLOR_MAP = {
+        "DRIVER": "#007bff",
+        "AI ENGINEER": "#00ff7f",
+        "AI STRATEGIST": "#ff4500",
+        "SYSTEM": "#8b949e"
+    }
+
+    def __init__(self, config, overlay, logger=None):
         self.config = config
-        self.telemetry_manager = telemetry_manager
-        self.voice_manager = voice_manager
-        self.network_manager = network_manager
+        self.overlay = overlay
         self.logger = logger
         self.active = False
         
         # UI Windows
         self.status_window = None
         self.voice_window = None
+        self.log_text = None
+        self._log_editable = False
         self.status_labels = {}
-        
-        # Voice Communication State
-        self.is_recording = False
-        self.ptt_key = 'space'
-        self.conversation_log = []
+
+    @property
+    def conversation_log(self):
+        return self.overlay.conversation_log
 
     def start(self):
         if self.logger:
             self.logger.info("[UI] Starting...")
         self.active = True
+        self.overlay.on_log_entry(self._render_entry)
+        # The log window is built on the first push-to-talk, not at startup;
+        # the overlay owns the PTT bindings, so hook its recording start
+        self.overlay.on_recording_start(self._open_voice_window)
         self.init_status_window()
-        self.init_voice_window()
 
     def init_status_window(self):
-        self.status_window = tk.Tk()
+        # Share the overlay's interpreter instead of starting a second Tk()
+        self.status_window = tk.Toplevel(self.overlay.root) if self.overlay.root else tk.Tk()
         self.status_window.title("Blackbox Driver - System Health")
         frame = ttk.Frame(self.status_window, padding=10)
         frame.pack(fill='both', expand=True)
@@ -46,6 +58,8 @@ class UIManager:
             lbl = tk.Label(row, text="...", width=30, anchor='w')
             lbl.pack(side='left')
             self.status_labels[mod] = lbl
+        self.status_window.bind('<KeyPress-space>', self.start_recording)
+        self.status_window.bind('<KeyRelease-space>', self.overlay.stop_recording)
         self.status_window.after(1000, self.status_window.update)
 
     def update_status(self, telemetry_status, voice_status, network_status, ui_status):
@@ -60,7 +74,6 @@ class UIManager:
                 self.status_labels[mod].config(text="OK", fg="green")
             else:
                 self.status_labels[mod].config(text=f"ERROR: {detail}", fg="red")
-        self.status_window.update_idletasks()
 
     def update(self):
         if not self.active:
@@ -69,7 +82,7 @@ class UIManager:
 
     def init_voice_window(self):
         """Initialize voice communication window matching team engineer HUD"""
-        self.voice_window = tk.Toplevel()
+        self.voice_window = tk.Toplevel(self.status_window)
         self.voice_window.title("Blackbox Driver - Team Radio")
         self.voice_window.geometry("400x600")
         self.voice_window.configure(bg='#0d1117')
@@ -84,38 +97,11 @@ class UIManager:
                               fg='#007bff', bg='#0d1117')
         title_label.pack(pady=(0, 20))
         
-        # PTT Button Frame
-        ptt_frame = tk.Frame(main_frame, bg='#0d1117')
-        ptt_frame.pack(pady=20)
-        
-        # PTT Button
-        self.ptt_button = tk.Button(ptt_frame, text="🎙️\nHOLD TO TALK\nSPACE",
-                                   font=('JetBrains Mono', 12, 'bold'),
-                                   fg='#ffffff', bg='#1a1a1a',
-                                   activeforeground='#ffffff', activebackground='#007bff',
-                                   relief='raised', bd=3,
-                                   width=15, height=6)
-        self.ptt_button.pack()
-        
-        # Bind PTT events
-        self.ptt_button.bind('<Button-1>', self.start_recording)
-        self.ptt_button.bind('<ButtonRelease-1>', self.stop_recording)
+        # Push-to-talk is forwarded to the overlay
         self.voice_window.bind('<KeyPress-space>', self.start_recording)
-        self.voice_window.bind('<KeyRelease-space>', self.stop_recording)
+        self.voice_window.bind('<KeyRelease-space>', self.overlay.stop_recording)
         self.voice_window.focus_set()
         
-        # Status Frame
-        status_frame = tk.Frame(main_frame, bg='#0d1117')
-        status_frame.pack(pady=20)
-        
-        tk.Label(status_frame, text="STATUS:", font=('JetBrains Mono', 10),
-                fg='#8b949e', bg='#0d1117').pack()
-        
-        self.voice_status_label = tk.Label(status_frame, text="READY",
-                                          font=('JetBrains Mono', 12, 'bold'),
-                                          fg='#00ff7f', bg='#0d1117')
-        self.voice_status_label.pack()
-        
         # Communication Log Frame
         log_frame = tk.Frame(main_frame, bg='#0d1117')
         log_frame.pack(fill='both', expand=True, pady=20)
@@ -138,106 +124,63 @@ class UIManager:
         scrollbar = tk.Scrollbar(log_container, command=self.log_text.yview)
         self.log_text.configure(yscrollcommand=scrollbar.set)
         
+        # One tag per speaker, configured once; unknown speakers use the default fg
+        for speaker, color in self._COLOR_MAP.items():
+            self.log_text.tag_configure(speaker, foreground=color)
+        
         self.log_text.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
-        # Add sample entries
-        self.add_to_conversation_log("SYSTEM", "Voice communication initialized")
-        self.add_to_conversation_log("SYSTEM", "Press SPACE or click button to talk")
+        # Show anything logged before the window existed
+        for timestamp, speaker, message in self.conversation_log:
+            self.log_text.insert('end', f"[{timestamp}] {speaker}: {message}\n", speaker)
+        self.log_text.configure(state='disabled')
         
+    def _open_voice_window(self):
+        if self.voice_window is None and self.status_window is not None:
+            self.init_voice_window()
+    
     def start_recording(self, event=None):
-        """Start voice recording"""
-        if self.is_recording or not self.voice_manager:
-            return
-            
-        try:
-            self.is_recording = True
-            self.voice_manager.start_recording()
-            
-            # Update UI
-            self.ptt_button.configure(bg='#ff4500', text="🔴\nRECORDING...\nRELEASE TO SEND")
-            self.voice_status_label.configure(text="RECORDING", fg='#ff4500')
-            
-            if self.logger:
-                self.logger.info("[UI] Started voice recording")
-                
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"[UI] Failed to start recording: {e}")
-            self.voice_status_label.configure(text="ERROR", fg='#ff4444')
+        """Record through the overlay; its recording hook opens the log window"""
+        self.overlay.start_recording(event)
     
     def stop_recording(self, event=None):
-        """Stop voice recording"""
-        if not self.is_recording or not self.voice_manager:
-            return
-            
-        try:
-            self.is_recording = False
-            audio_data = self.voice_manager.stop_recording()
-            
-            # Send to backend via network manager
-            if self.network_manager and audio_data:
-                self.network_manager.send_voice_data(audio_data)
-                self.add_to_conversation_log("DRIVER", "Voice message sent")
-            
-            # Update UI
-            self.ptt_button.configure(bg='#1a1a1a', text="🎙️\nHOLD TO TALK\nSPACE")
-            self.voice_status_label.configure(text="READY", fg='#00ff7f')
-            
-            if self.logger:
-                self.logger.info("[UI] Stopped voice recording")
-                
-        except Exception as e:
-            if self.logger:
-                self.logger.error(f"[UI] Failed to stop recording: {e}")
-            self.voice_status_label.configure(text="ERROR", fg='#ff4444')
+        self.overlay.stop_recording(event)
     
     def add_to_conversation_log(self, speaker, message):
         """Add entry to conversation log"""
-        timestamp = time.strftime("%H:%M:%S")
-        
-        # Color coding for different speakers
-        color_map = {
-            "DRIVER": "#007bff",
-            "AI ENGINEER": "#00ff7f", 
-            "AI STRATEGIST": "#ff4500",
-            "SYSTEM": "#8b949e"
-        }
-        
-        color = color_map.get(speaker, "#c9d1d9")
-        
-        # Add to conversation history
-        entry = {
-            "timestamp": timestamp,
-            "speaker": speaker,
-            "message": message
-        }
-        self.conversation_log.append(entry)
-        
-        # Update UI
+        self.overlay.add_to_conversation_log(speaker, message)
+    
+    def _render_entry(self, entry):
+        """Append an overlay log entry to the log window, if it has been opened"""
+        if self.log_text:
+            # A burst of entries unlocks the widget once and relocks it at idle
+            if not self._log_editable:
+                self.log_text.configure(state='normal')
+                self._log_editable = True
+                self.log_text.after_idle(self._lock_log)
+            timestamp, speaker, message = entry
+            self.log_text.insert('end', f"[{timestamp}] {speaker}: {message}\n", speaker)
+            # Trim the widget to match the in-memory log; 'end-1c' sits on the empty last line
+            if int(self.log_text.index('end-1c').split('.')[0]) - 1 > CONVERSATION_LOG_SIZE:
+                self.log_text.delete('1.0', '2.0')
+    
+    def _lock_log(self):
         if self.log_text:
-            self.log_text.configure(state='normal')
-            self.log_text.insert('end', f"[{timestamp}] {speaker}: {message}\n")
             self.log_text.configure(state='disabled')
             self.log_text.see('end')
-        
-        # Limit log entries (keep last 100)
-        if len(self.conversation_log) > 100:
-            self.conversation_log.pop(0)
+        self._log_editable = False
     
     def handle_voice_response(self, speaker, message):
         """Handle incoming voice responses from AI"""
-        self.add_to_conversation_log(speaker, message)
-        
-        # Play audio if available (would integrate with voice_manager TTS)
-        if self.voice_manager:
-            self.voice_manager.play_tts_response(message)
+        self.overlay.handle_voice_response(speaker, message)
 
     def stop(self):
         if self.logger:
             self.logger.info("[UI] Stopping...")
-        if self.status_window:
-            self.status_window.destroy()
+        # The log window is a child of the status window, so close it first
         if self.voice_window:
             self.voice_window.destroy()
+        if self.status_window:
+            self.status_window.destroy()
         self.active = False
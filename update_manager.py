@@ -4,17 +4,115 @@ PROJECT:BLACKBOX - Remote Update Manager
 Handles automatic updates from GitHub and remote deployment
 """
 
+import asyncio
 import os
 import sys
 import json
+import re
 import time
+import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import subprocess
 import zipfile
 import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BufferedReader
 from pathlib import Path
 from datetime import datetime
 
+# packaging understands pre/post-release versions; plain numeric comparison otherwise
+try:
+    from packaging.version import Version
+except ImportError:
+    Version = None
+
+# orjson encodes straight to bytes; fall back to the stdlib when it isn't installed
+try:
+    from orjson import dumps as _orjson_dumps, loads as _loads, OPT_INDENT_2
+    
+    def _dumps(obj, pretty=False):
+        return _orjson_dumps(obj, option=OPT_INDENT_2 if pretty else None)
+except ImportError:
+    _loads = json.loads
+    
+    def _dumps(obj, pretty=False):
+        return json.dumps(obj, indent=2 if pretty else None).encode()
+
+# Downloads larger than this spill from memory to a temp file
+DOWNLOAD_SPOOL_SIZE = 64 * 1024 * 1024
+COPY_BUFFER_SIZE = 1 << 20
+# Archive members are decompressed and written in parallel; zlib and file I/O release the GIL
+UPDATE_WRITE_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+# Conditional-request validators and the last release seen, kept across runs
+UPDATE_CACHE_FILE = '.update_cache.json'
+# GitHub rate limiting: wait at least this long, doubling on each consecutive refusal
+RATE_LIMIT_DEFAULT_WAIT = 60  # seconds
+RATE_LIMIT_MAX_DOUBLINGS = 6
+# Files to preserve during update (archive-relative, slash-separated); never overwritten
+PRESERVE_FILES = frozenset({
+    'config/settings.json',
+    'config/settings.local.json',
+    'blackbox.log'
+})
+# Matches "v1.2.3" or "Version 1.2.3", including pre/post-release suffixes
+# (a trailing "." is punctuation, not part of the version)
+VERSION_PATTERN = re.compile(r'\bv(?:ersion\s+)?(\d+\.\d+\.\d+(?:[\w.+-]*[\w+-])?)', re.IGNORECASE)
+NUMERIC_VERSION = re.compile(r'\d+(?:\.\d+)*')
+
+def _backup_tree(src, dst, replaced):
+    """Mirror src at dst, hard-linking the files in replaced and copying everything else"""
+    # A link shares the live file's inode, so it only stays a snapshot for files the update
+    # swaps out with os.replace; anything changed in place (e.g. the open log) is copied
+    os.makedirs(dst, exist_ok=True)
+    # scandir entries carry their type from readdir, so no extra stat per file
+    with os.scandir(src) as entries:
+        for entry in entries:
+            dst_file = os.path.join(dst, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                _backup_tree(entry.path, dst_file, replaced)
+                continue
+            if entry.path in replaced:
+                try:
+                    os.link(entry.path, dst_file, follow_symlinks=False)
+                    continue
+                except OSError:
+                    # Cross-device, unsupported filesystem, or link limit reached
+                    pass
+            shutil.copy2(entry.path, dst_file, follow_symlinks=False)
+
+def _update_members(archive):
+    """Yield (install-relative path, ZipInfo) for each archive file an update should write"""
+    for info in archive.infolist():
+        # GitHub zipballs wrap everything in a top-level repo-sha/ directory
+        rel = info.filename.partition('/')[2]
+        if not rel or rel.endswith('/'):
+            continue
+        
+        # Skip git files and preserved files; plain string checks on the member name
+        if rel.startswith('.git') or '/.git' in rel:
+            continue
+        if rel in PRESERVE_FILES:
+            continue
+        
+        # Never write outside the install directory
+        parts = rel.replace('\\', '/').split('/')
+        if '..' in parts or os.path.isabs(rel) or os.path.splitdrive(rel)[0]:
+            continue
+        yield rel, info
+
+def _write_member(archive, info, dest_path):
+    """Write one archive member over dest_path"""
+    # Write a new file and rename it over the old one; truncating in place
+    # would also change the hard-linked backup copy
+    tmp_path = dest_path.with_name(dest_path.name + '.update')
+    with archive.open(info) as src, open(tmp_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+    os.replace(tmp_path, dest_path)
+
 class UpdateManager:
     def __init__(self, config, logger=None):
         self.config = config
@@ -35,7 +133,61 @@ class UpdateManager:
         
         # Version tracking
         self.current_version = self.get_current_version()
-        self.last_check = 0
+        self.last_check = 0  # wall clock, for display and persistence
+        # Interval checks use the monotonic clock so NTP adjustments can't skip or repeat them
+        self._last_check_mono = float('-inf')
+        # Set after a 403/429 from GitHub; no checks run before this monotonic time
+        self._next_check = 0.0
+        self._rate_limit_strikes = 0
+        
+        # GitHub release cache for conditional requests
+        self._etag = None
+        self._last_modified = None
+        self._cached_release = None
+        self._cache_lock = threading.Lock()
+        self._load_update_cache()
+        
+        # Check/download/apply runs on one worker so callers never block and updates never overlap
+        self._exec = ThreadPoolExecutor(max_workers=1, thread_name_prefix='updater')
+        self._update_future = None
+        
+        # Pooled session so repeat checks reuse the TLS connection
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                                 max_retries=Retry(total=2, backoff_factor=0.2)))
+        
+    def _load_update_cache(self):
+        try:
+            with open(self.app_dir / UPDATE_CACHE_FILE, 'r') as f:
+                cache = json.load(f)
+            self._etag = cache.get('etag')
+            self._last_modified = cache.get('last_modified')
+            self._cached_release = cache.get('release')
+            # Carry the check interval across restarts
+            last_check = cache.get('last_check')
+            if last_check:
+                self.last_check = last_check
+                self._last_check_mono = time.monotonic() - max(0, time.time() - last_check)
+        except (OSError, ValueError):
+            pass
+            
+    def _save_update_cache(self):
+        cache_file = self.app_dir / UPDATE_CACHE_FILE
+        tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+        try:
+            # Write a sibling file and rename it so a crash never leaves a torn cache
+            with self._cache_lock:
+                with open(tmp_file, 'w') as f:
+                    json.dump({
+                        'etag': self._etag,
+                        'last_modified': self._last_modified,
+                        'release': self._cached_release,
+                        'last_check': self.last_check
+                    }, f)
+                os.replace(tmp_file, cache_file)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"[UpdateManager] Could not write update cache: {e}")
         
     def get_current_version(self):
         """Get current version from VERSION.md"""
@@ -43,15 +195,11 @@ class UpdateManager:
             version_file = self.app_dir / 'VERSION.md'
             if version_file.exists():
                 with open(version_file, 'r') as f:
-                    content = f.read()
-                    # Extract version from first line
-                    for line in content.split('\n'):
-                        if 'v' in line and '.' in line:
-                            # Extract version like "v1.0.0"
-                            import re
-                            match = re.search(r'v(\d+\.\d+\.\d+)', line)
-                            if match:
-                                return match.group(1)
+                    # The version sits in the header; stop reading at the first match
+                    for line in f:
+                        match = VERSION_PATTERN.search(line)
+                        if match:
+                            return match.group(1)
             return "1.0.0"
         except Exception as e:
             if self.logger:
@@ -70,11 +218,29 @@ class UpdateManager:
             
             if self.github_token:
                 headers['Authorization'] = f'token {self.github_token}'
+            # Ask GitHub to answer 304 with no body when the release hasn't changed
+            if self._cached_release:
+                if self._etag:
+                    headers['If-None-Match'] = self._etag
+                if self._last_modified:
+                    headers['If-Modified-Since'] = self._last_modified
                 
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                release_data = response.json()
+            response = self._http.get(url, headers=headers, timeout=10)
+            
+            if response.status_code in (403, 429):
+                self._back_off(response)
+            elif response.status_code in (200, 304):
+                self._rate_limit_strikes = 0
+                if response.status_code == 304:
+                    release_data = self._cached_release
+                else:
+                    data = response.json()
+                    release_data = {key: data.get(key) for key in
+                                    ('tag_name', 'zipball_url', 'body', 'published_at')}
+                    self._etag = response.headers.get('ETag')
+                    self._last_modified = response.headers.get('Last-Modified')
+                    self._cached_release = release_data
+                    self._save_update_cache()
                 latest_version = release_data['tag_name'].replace('v', '')
                 
                 if self.logger:
@@ -102,23 +268,43 @@ class UpdateManager:
                 
         return None
         
+    def _back_off(self, response):
+        """Hold off GitHub checks after a rate-limit refusal, with jitter and exponential growth"""
+        headers = response.headers
+        wait = RATE_LIMIT_DEFAULT_WAIT
+        try:
+            if 'Retry-After' in headers:
+                wait = max(wait, int(headers['Retry-After']))
+            elif headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset' in headers:
+                wait = max(wait, int(headers['X-RateLimit-Reset']) - time.time())
+        except ValueError:
+            pass
+        wait *= 2 ** min(self._rate_limit_strikes, RATE_LIMIT_MAX_DOUBLINGS) * (1 + random.random())
+        self._rate_limit_strikes += 1
+        self._next_check = time.monotonic() + wait
+        if self.logger:
+            self.logger.warning(f"[UpdateManager] GitHub rate limited ({response.status_code}); "
+                                f"next check in {wait:.0f}s")
+        
     def is_newer_version(self, new_version, current_version):
         """Compare version strings (semantic versioning)"""
         try:
-            new_parts = [int(x) for x in new_version.split('.')]
-            current_parts = [int(x) for x in current_version.split('.')]
+            if Version is not None:
+                return Version(new_version) > Version(current_version)
+            new_parts = [int(x) for x in NUMERIC_VERSION.match(new_version).group().split('.')]
+            current_parts = [int(x) for x in NUMERIC_VERSION.match(current_version).group().split('.')]
             
             # Pad shorter version with zeros
             max_len = max(len(new_parts), len(current_parts))
             new_parts.extend([0] * (max_len - len(new_parts)))
             current_parts.extend([0] * (max_len - len(current_parts)))
-            
             return new_parts > current_parts
-        except:
+        except (ValueError, AttributeError):
+            # InvalidVersion is a ValueError; AttributeError means no leading number
             return False
             
     def download_update(self, update_info):
-        """Download and extract update from GitHub"""
+        """Download an update from GitHub and return it as an open ZipFile"""
         try:
             download_url = update_info['download_url']
             version = update_info['version']
@@ -126,101 +312,59 @@ class UpdateManager:
             if self.logger:
                 self.logger.info(f"[UpdateManager] Downloading update v{version}...")
             
-            # Create temp directory
-            temp_dir = self.app_dir / 'temp_update'
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir)
-            temp_dir.mkdir()
-            
             # Download zip file
             headers = {}
             if self.github_token:
                 headers['Authorization'] = f'token {self.github_token}'
                 
-            response = requests.get(download_url, headers=headers, stream=True)
-            
-            if response.status_code == 200:
-                zip_path = temp_dir / f'update_v{version}.zip'
-                
-                with open(zip_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+            with self._http.get(download_url, headers=headers, stream=True, timeout=(10, 30)) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Download failed: {response.status_code}")
                 
-                # Extract zip
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(temp_dir)
-                
-                return temp_dir
-            else:
-                raise Exception(f"Download failed: {response.status_code}")
+                # Spool the archive in memory (on disk only if it is large) instead of
+                # writing a zip file and reading it back
+                response.raw.decode_content = True
+                buf = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_SIZE)
+                shutil.copyfileobj(BufferedReader(response.raw, buffer_size=COPY_BUFFER_SIZE),
+                                   buf, COPY_BUFFER_SIZE)
+            
+            # apply_update reads members straight out of the archive
+            buf.seek(0)
+            return zipfile.ZipFile(buf)
                 
         except Exception as e:
             if self.logger:
                 self.logger.error(f"[UpdateManager] Download error: {e}")
             return None
             
-    def apply_update(self, temp_dir, version):
-        """Apply the downloaded update"""
+    def apply_update(self, archive, version):
+        """Apply the downloaded update, writing each archive member to its final path"""
         try:
             if self.logger:
                 self.logger.info(f"[UpdateManager] Applying update v{version}...")
             
-            # Find extracted directory (GitHub creates nested dirs)
-            extracted_dirs = [d for d in temp_dir.iterdir() if d.is_dir()]
-            if not extracted_dirs:
-                raise Exception("No extracted directory found")
-                
-            source_dir = extracted_dirs[0]
+            # No intermediate extracted tree: plan the writes and create directories serially,
+            # then write each file once straight from the archive
+            plan = [(info, self.app_dir / rel) for rel, info in _update_members(archive)]
             
-            # Create backup of current installation
+            # Create backup of current installation; files the update replaces are hard-linked
+            # (metadata only), the rest are copied since they may still change in place
             backup_dir = self.app_dir.parent / f'blackbox_backup_{int(time.time())}'
-            shutil.copytree(self.app_dir, backup_dir)
+            _backup_tree(str(self.app_dir), str(backup_dir), {str(dest_path) for _, dest_path in plan})
             
             if self.logger:
                 self.logger.info(f"[UpdateManager] Backup created: {backup_dir}")
             
-            # Files to preserve during update
-            preserve_files = [
-                'config/settings.json',
-                'config/settings.local.json',
-                'blackbox.log'
-            ]
-            
-            preserved_data = {}
-            for file_path in preserve_files:
-                full_path = self.app_dir / file_path
-                if full_path.exists():
-                    with open(full_path, 'r') as f:
-                        preserved_data[file_path] = f.read()
-            
-            # Update files (skip .git and preserved files)
-            for item in source_dir.rglob('*'):
-                if item.is_file():
-                    rel_path = item.relative_to(source_dir)
-                    
-                    # Skip git files and other unwanted files
-                    if any(part.startswith('.git') for part in rel_path.parts):
-                        continue
-                        
-                    dest_path = self.app_dir / rel_path
-                    dest_path.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Copy file
-                    shutil.copy2(item, dest_path)
-            
-            # Restore preserved files
-            for file_path, content in preserved_data.items():
-                full_path = self.app_dir / file_path
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(full_path, 'w') as f:
-                    f.write(content)
+            for parent in {dest_path.parent for _, dest_path in plan}:
+                parent.mkdir(parents=True, exist_ok=True)
+            with ThreadPoolExecutor(max_workers=UPDATE_WRITE_WORKERS) as pool:
+                futures = [pool.submit(_write_member, archive, info, dest_path) for info, dest_path in plan]
+                for future in as_completed(futures):
+                    future.result()
             
             # Update version info
             self.current_version = version
             
-            # Clean up temp directory
-            shutil.rmtree(temp_dir)
-            
             if self.logger:
                 self.logger.info(f"[UpdateManager] Update to v{version} completed successfully!")
             
@@ -230,6 +374,8 @@ class UpdateManager:
             if self.logger:
                 self.logger.error(f"[UpdateManager] Update failed: {e}")
             return False
+        finally:
+            archive.close()
             
     def check_digital_ocean_updates(self):
         """Check Digital Ocean backend for configuration updates"""
@@ -248,10 +394,10 @@ class UpdateManager:
                 'client_id': self.config.get('client_id', 'unknown')
             }
             
-            response = requests.post(url, headers=headers, json=data, timeout=10)
+            response = self._http.post(url, headers=headers, data=_dumps(data), timeout=10)
             
             if response.status_code == 200:
-                update_data = response.json()
+                update_data = _loads(response.content)
                 
                 if update_data.get('has_updates'):
                     return update_data
@@ -274,8 +420,8 @@ class UpdateManager:
                 
                 # Save updated config
                 config_file = self.app_dir / 'config' / 'settings.json'
-                with open(config_file, 'w') as f:
-                    json.dump(current_config, f, indent=2)
+                with open(config_file, 'wb') as f:
+                    f.write(_dumps(current_config, pretty=True))
                 
                 if self.logger:
                     self.logger.info("[UpdateManager] Configuration updated from Digital Ocean")
@@ -289,18 +435,30 @@ class UpdateManager:
         return False
         
     def auto_update_check(self):
-        """Perform automatic update check if enabled"""
-        current_time = time.time()
+        """Start an automatic update check in the background if one is due; returns its future"""
+        if self._update_future is not None and not self._update_future.done():
+            return self._update_future
+            
+        current_time = time.monotonic()
         
-        # Check if it's time for an update check
-        if current_time - self.last_check < (self.update_interval * 3600):
-            return
+        # Check if it's time for an update check, and that GitHub isn't asking us to wait
+        if current_time - self._last_check_mono < (self.update_interval * 3600):
+            return None
+        if current_time < self._next_check:
+            return None
             
-        self.last_check = current_time
+        self._last_check_mono = current_time
+        self.last_check = time.time()
+        self._save_update_cache()
         
         if not self.auto_update:
-            return
+            return None
             
+        self._update_future = self._exec.submit(self._run_update_pipeline)
+        return self._update_future
+        
+    def _run_update_pipeline(self):
+        """Check, download and apply updates; runs on the updater thread"""
         if self.logger:
             self.logger.info("[UpdateManager] Performing automatic update check...")
         
@@ -311,13 +469,10 @@ class UpdateManager:
                 self.logger.info(f"[UpdateManager] New version available: v{github_update['version']}")
             
             # Download and apply update
-            temp_dir = self.download_update(github_update)
-            if temp_dir:
-                success = self.apply_update(temp_dir, github_update['version'])
-                if success:
-                    if self.logger:
-                        self.logger.info("[UpdateManager] Automatic update completed!")
-                    return True
+            if self._download_and_apply(github_update):
+                if self.logger:
+                    self.logger.info("[UpdateManager] Automatic update completed!")
+                return True
         
         # Check Digital Ocean for config updates
         do_update = self.check_digital_ocean_updates()
@@ -326,6 +481,21 @@ class UpdateManager:
             
         return False
         
+    def _download_and_apply(self, update_info):
+        archive = self.download_update(update_info)
+        if archive:
+            return self.apply_update(archive, update_info['version'])
+        return False
+        
+    async def run(self):
+        """Run automatic update checks in a worker thread once each interval"""
+        while True:
+            future = self.auto_update_check()
+            if future is not None:
+                await asyncio.wrap_future(future)
+            next_check = max(self._last_check_mono + self.update_interval * 3600, self._next_check)
+            await asyncio.sleep(max(1, next_check - time.monotonic()))
+        
     def manual_update(self):
         """Manually trigger an update check and apply"""
         if self.logger:
@@ -339,16 +509,15 @@ class UpdateManager:
             
             response = input("Do you want to update now? (y/n): ")
             if response.lower() == 'y':
-                temp_dir = self.download_update(update_info)
-                if temp_dir:
-                    success = self.apply_update(temp_dir, update_info['version'])
-                    if success:
-                        print("Update completed successfully!")
-                        print("Please restart the application.")
-                        return True
-                    else:
-                        print("Update failed. Check logs for details.")
-                        return False
+                # Queue behind any automatic update rather than applying concurrently
+                success = self._exec.submit(self._download_and_apply, update_info).result()
+                if success:
+                    print("Update completed successfully!")
+                    print("Please restart the application.")
+                    return True
+                else:
+                    print("Update failed. Check logs for details.")
+                    return False
         else:
             print("No updates available.")
             return False
@@ -359,6 +528,7 @@ class UpdateManager:
             'current_version': self.current_version,
             'auto_update_enabled': self.auto_update,
             'last_check': self.last_check,
+            'update_running': self._update_future is not None and self._update_future.running(),
             'github_repo': self.github_repo,
             'digital_ocean_enabled': bool(self.do_endpoint and self.do_api_key)
         }
@@ -6,12 +6,40 @@ Voice Manager
 import sounddevice as sd
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import re
+import hashlib
+import asyncio
 import threading
 import queue
 import time
-import io
-from scipy.io import wavfile
+import subprocess
+from collections import OrderedDict
+
+# Fixed capture block size, so recording length bounds the number of frames queued
+RECORD_BLOCKSIZE = 1024
+# TTS replies are decoded by ffmpeg to mono int16 PCM at this rate
+TTS_SAMPLE_RATE = 22050
+TTS_CHUNK_SAMPLES = 4096
+# Decoded replies kept for repeat phrases, least recently used evicted first
+TTS_CACHE_SIZE = 32
+# Deepgram live transcription; audio is streamed while the push-to-talk key is held
+DEEPGRAM_STREAM_URL = 'wss://api.deepgram.com/v1/listen'
+
+# Keyword -> reply, checked in priority order; the first matching entry wins
+VOICE_COMMANDS = (
+    (('pit',), "Pit window is open. Fuel and tires ready."),
+    (('position', 'place'), "You are currently in 3rd place."),
+    (('time', 'lap'), "Current lap time: 1 minute 23 seconds."),
+    (('fuel',), "Fuel level at 75 percent."),
+    (('tire', 'tyre'), "Tire temperatures are optimal."),
+)
+# One pass over the utterance; the lookahead reports every keyword hit, even overlapping ones,
+# and alternatives are listed in priority order so hits starting together favour the higher rank
+_COMMAND_PRIORITY = {kw: rank for rank, (keywords, _) in enumerate(VOICE_COMMANDS) for kw in keywords}
+_COMMAND_PATTERN = re.compile('(?=(' + '|'.join(map(re.escape, _COMMAND_PRIORITY)) + '))')
 
 class VoiceManager:
     def __init__(self, config, logger=None):
@@ -24,17 +52,26 @@ class VoiceManager:
         # Voice processing state
         self.recording = False
         self.audio_queue = queue.Queue()
+        self.streaming_stt = self.config.get('voice', {}).get('streaming_stt', True)
+        self._stt_queue = None
         self.command_callback = None
+        self._tts_cache = OrderedDict()
+        self._tts_cache_lock = threading.Lock()
         self.sample_rate = 16000  # Standard for speech recognition
         self.channels = 1
         
         # API clients
         self.deepgram_key = self.config.get('api_keys', {}).get('deepgram', '')
         self.elevenlabs_key = self.config.get('api_keys', {}).get('elevenlabs', '')
+        # Keep-alive session: each command reuses the Deepgram/ElevenLabs connections
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                                 max_retries=Retry(total=2, backoff_factor=0.2)))
         
         # Audio devices
         self.input_device = None
         self.output_device = None
+        self.stream = None
         self._setup_audio_devices()
 
     def _setup_audio_devices(self):
@@ -43,19 +80,12 @@ class VoiceManager:
             input_name = self.config.get('voice', {}).get('input_device', 'default')
             output_name = self.config.get('voice', {}).get('output_device', 'default')
             
-            devices = sd.query_devices()
-            
-            # Find input device
-            for i, device in enumerate(devices):
-                if device['name'] == input_name and device['max_input_channels'] > 0:
+            # Enumerate once and resolve both devices in a single pass
+            for i, device in enumerate(sd.query_devices()):
+                if self.input_device is None and device['name'] == input_name and device['max_input_channels'] > 0:
                     self.input_device = i
-                    break
-            
-            # Find output device
-            for i, device in enumerate(devices):
-                if device['name'] == output_name and device['max_output_channels'] > 0:
+                if self.output_device is None and device['name'] == output_name and device['max_output_channels'] > 0:
                     self.output_device = i
-                    break
                     
             if self.logger:
                 self.logger.info(f"[Voice] Audio devices: input={self.input_device}, output={self.output_device}")
@@ -81,8 +111,10 @@ class VoiceManager:
         # Check audio devices
         input_device = self.config.get('voice', {}).get('input_device', 'default')
         output_device = self.config.get('voice', {}).get('output_device', 'default')
-        input_devices = [d['name'] for d in sd.query_devices() if d['max_input_channels'] > 0]
-        output_devices = [d['name'] for d in sd.query_devices() if d['max_output_channels'] > 0]
+        # PortAudio enumeration is slow; query once and check membership against sets
+        devices = sd.query_devices()
+        input_devices = {d['name'] for d in devices if d['max_input_channels'] > 0}
+        output_devices = {d['name'] for d in devices if d['max_output_channels'] > 0}
         
         if input_device not in input_devices:
             errors.append(f"Input device '{input_device}' not found.")
@@ -106,33 +138,39 @@ class VoiceManager:
 
     def start_recording(self):
         """Start recording audio for voice commands"""
-        if not self.active or self.recording:
+        if not self.active or self.recording or self.stream is None:
             return
             
+        # The input stream runs continuously; discard frames left from an earlier take
+        while True:
+            try:
+                self.audio_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+        # Streaming: frames go to Deepgram as they are captured; otherwise buffer for one POST
+        if self.streaming_stt:
+            self._stt_queue = queue.Queue()
+            threading.Thread(target=self._stream_speech, args=(self._stt_queue,), daemon=True).start()
+            
+        self._recording_start_time = time.monotonic()
         self.recording = True
         if self.logger:
             self.logger.info("[Voice] Starting voice recording...")
-            
-        def audio_callback(indata, frames, time, status):
-            if status:
-                if self.logger:
-                    self.logger.warning(f"[Voice] Audio callback status: {status}")
-            if self.recording:
-                self.audio_queue.put(indata.copy())
-        
-        try:
-            self.stream = sd.InputStream(
-                device=self.input_device,
-                channels=self.channels,
-                samplerate=self.sample_rate,
-                callback=audio_callback,
-                dtype=np.float32
-            )
-            self.stream.start()
-        except Exception as e:
-            self.recording = False
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        # Frames are only kept while push-to-talk is held
+        if not self.recording:
+            return
+        if status:
             if self.logger:
-                self.logger.error(f"[Voice] Error starting recording: {e}")
+                self.logger.warning(f"[Voice] Audio callback status: {status}")
+        stt_queue = self._stt_queue
+        if stt_queue is not None:
+            np.multiply(indata, 32767.0, out=indata, casting='unsafe')
+            stt_queue.put(indata.astype(np.int16).tobytes())
+        else:
+            self.audio_queue.put(indata.copy())
 
     def stop_recording(self):
         """Stop recording and process the audio"""
@@ -144,18 +182,30 @@ class VoiceManager:
             self.logger.info("[Voice] Stopping voice recording...")
             
         try:
-            if hasattr(self, 'stream'):
-                self.stream.stop()
-                self.stream.close()
+            if self._stt_queue is not None:
+                # Audio has already been streamed; tell the sender to finalize
+                self._stt_queue.put(None)
+                self._stt_queue = None
+                return
                 
-            # Collect recorded audio
-            audio_data = []
-            while not self.audio_queue.empty():
-                audio_data.append(self.audio_queue.get())
+            # Copy recorded blocks into one buffer sized from the recording length
+            expected = int((time.monotonic() - self._recording_start_time) * self.sample_rate) + RECORD_BLOCKSIZE
+            audio_array = np.empty((expected, self.channels), dtype=np.float32)
+            idx = 0
+            while True:
+                try:
+                    block = self.audio_queue.get_nowait()
+                except queue.Empty:
+                    break
+                end = idx + len(block)
+                if end > len(audio_array):
+                    # Clock drift or a late callback; grow rather than drop audio
+                    audio_array = np.resize(audio_array, (max(end, 2 * len(audio_array)), self.channels))
+                audio_array[idx:end] = block
+                idx = end
                 
-            if audio_data:
-                audio_array = np.concatenate(audio_data, axis=0)
-                threading.Thread(target=self._process_speech, args=(audio_array,), daemon=True).start()
+            if idx:
+                threading.Thread(target=self._process_speech, args=(audio_array[:idx],), daemon=True).start()
                 
         except Exception as e:
             if self.logger:
@@ -164,34 +214,31 @@ class VoiceManager:
     def _process_speech(self, audio_data):
         """Process recorded speech using Deepgram STT"""
         try:
-            # Convert float32 to int16 for Deepgram
-            audio_int16 = (audio_data * 32767).astype(np.int16)
-            
-            # Create WAV file in memory
-            wav_buffer = io.BytesIO()
-            wavfile.write(wav_buffer, self.sample_rate, audio_int16)
-            wav_data = wav_buffer.getvalue()
-            
-            # Send to Deepgram
+            # Scale in place (the buffer is ours) and convert float32 to int16 for Deepgram
+            np.multiply(audio_data, 32767.0, out=audio_data, casting='unsafe')
+            self._transcribe_pcm(audio_data.astype(np.int16, copy=False).tobytes())
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"[Voice] Error processing speech: {e}")
+
+    def _transcribe_pcm(self, pcm):
+        """Transcribe int16 PCM with one batch request to Deepgram"""
+        try:
+            # Send raw PCM; the format is described in the query instead of a WAV header
             headers = {
                 'Authorization': f'Token {self.deepgram_key}',
-                'Content-Type': 'audio/wav'
+                'Content-Type': 'audio/raw'
             }
             
-            url = 'https://api.deepgram.com/v1/listen?model=nova-2&smart_format=true'
-            response = requests.post(url, headers=headers, data=wav_data, timeout=10)
+            url = (f'https://api.deepgram.com/v1/listen?model=nova-2&smart_format=true'
+                   f'&encoding=linear16&sample_rate={self.sample_rate}&channels={self.channels}')
+            response = self._http.post(url, headers=headers, data=pcm, timeout=10)
             
             if response.status_code == 200:
                 result = response.json()
                 transcript = result.get('results', {}).get('channels', [{}])[0].get('alternatives', [{}])[0].get('transcript', '')
                 
-                if transcript.strip():
-                    if self.logger:
-                        self.logger.info(f"[Voice] Speech recognized: '{transcript}'")
-                    self._handle_voice_command(transcript)
-                else:
-                    if self.logger:
-                        self.logger.info("[Voice] No speech detected")
+                self._dispatch_transcript(transcript)
             else:
                 if self.logger:
                     self.logger.error(f"[Voice] Deepgram API error: {response.status_code} {response.text}")
@@ -200,21 +247,79 @@ class VoiceManager:
             if self.logger:
                 self.logger.error(f"[Voice] Error processing speech: {e}")
 
+    def _stream_speech(self, stt_queue):
+        """Send captured PCM to Deepgram's live endpoint until the recording ends"""
+        try:
+            import websocket
+            url = (f'{DEEPGRAM_STREAM_URL}?model=nova-2&smart_format=true&interim_results=true'
+                   f'&encoding=linear16&sample_rate={self.sample_rate}&channels={self.channels}')
+            ws = websocket.create_connection(url, header=[f'Authorization: Token {self.deepgram_key}'],
+                                             timeout=5)
+        except Exception as e:
+            # Keep the command: collect what was captured and fall back to a batch request
+            if self.logger:
+                self.logger.warning(f"[Voice] Streaming STT unavailable, using batch request: {e}")
+            chunks = []
+            for chunk in iter(stt_queue.get, None):
+                chunks.append(chunk)
+            if chunks:
+                self._transcribe_pcm(b''.join(chunks))
+            return
+        
+        ws.settimeout(None)
+        threading.Thread(target=self._read_transcripts, args=(ws,), daemon=True).start()
+        try:
+            for chunk in iter(stt_queue.get, None):
+                ws.send_binary(chunk)
+            # Deepgram flushes the remaining results and then closes the socket
+            ws.send(json.dumps({'type': 'CloseStream'}))
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"[Voice] Error streaming speech: {e}")
+            ws.close()
+
+    def _read_transcripts(self, ws):
+        """Dispatch each finished utterance as soon as Deepgram finalizes it"""
+        finals = []
+        try:
+            while True:
+                message = ws.recv()
+                if not message:
+                    break
+                result = json.loads(message)
+                if result.get('type') != 'Results':
+                    continue
+                transcript = result.get('channel', {}).get('alternatives', [{}])[0].get('transcript', '')
+                if result.get('is_final') and transcript:
+                    finals.append(transcript)
+                if result.get('speech_final') and finals:
+                    self._dispatch_transcript(' '.join(finals))
+                    finals = []
+        except Exception:
+            # The socket closes after CloseStream; anything else was already logged by the sender
+            pass
+        finally:
+            ws.close()
+        if finals:
+            self._dispatch_transcript(' '.join(finals))
+
+    def _dispatch_transcript(self, transcript):
+        if transcript.strip():
+            if self.logger:
+                self.logger.info(f"[Voice] Speech recognized: '{transcript}'")
+            self._handle_voice_command(transcript)
+        else:
+            if self.logger:
+                self.logger.info("[Voice] No speech detected")
+
     def _handle_voice_command(self, command):
         """Handle recognized voice command"""
-        # Basic command processing - can be expanded
+        # Basic command processing - extend VOICE_COMMANDS to add more
         command_lower = command.lower().strip()
         
-        if 'pit' in command_lower:
-            response = "Pit window is open. Fuel and tires ready."
-        elif 'position' in command_lower or 'place' in command_lower:
-            response = "You are currently in 3rd place."
-        elif 'time' in command_lower or 'lap' in command_lower:
-            response = "Current lap time: 1 minute 23 seconds."
-        elif 'fuel' in command_lower:
-            response = "Fuel level at 75 percent."
-        elif 'tire' in command_lower or 'tyre' in command_lower:
-            response = "Tire temperatures are optimal."
+        rank = min((_COMMAND_PRIORITY[m.group(1)] for m in _COMMAND_PATTERN.finditer(command_lower)), default=None)
+        if rank is not None:
+            response = VOICE_COMMANDS[rank][1]
         else:
             response = f"Command received: {command}"
             
@@ -230,6 +335,18 @@ class VoiceManager:
         if not text.strip():
             return
             
+        # Fixed responses repeat often; replay their decoded PCM without calling the API
+        key = hashlib.blake2b(text.encode(), digest_size=8).digest()
+        with self._tts_cache_lock:
+            pcm = self._tts_cache.get(key)
+            if pcm is not None:
+                self._tts_cache.move_to_end(key)
+        if pcm is not None:
+            threading.Thread(target=self._play_pcm, args=(pcm,), daemon=True).start()
+            if self.logger:
+                self.logger.info(f"[Voice] Speaking (cached): '{text}'")
+            return
+            
         try:
             # ElevenLabs TTS API
             url = "https://api.elevenlabs.io/v1/text-to-speech/21m00Tcm4TlvDq8ikWAM"  # Default voice
@@ -247,50 +364,89 @@ class VoiceManager:
                 }
             }
             
-            response = requests.post(url, json=data, headers=headers, timeout=10)
+            response = self._http.post(url, json=data, headers=headers, timeout=10, stream=True)
             
             if response.status_code == 200:
-                # Play audio
-                audio_data = response.content
-                threading.Thread(target=self._play_audio, args=(audio_data,), daemon=True).start()
+                # Play while the MP3 is still downloading
+                threading.Thread(target=self._play_audio, args=(response, key), daemon=True).start()
                 
                 if self.logger:
                     self.logger.info(f"[Voice] Speaking: '{text}'")
             else:
                 if self.logger:
                     self.logger.error(f"[Voice] ElevenLabs API error: {response.status_code} {response.text}")
+                response.close()
                     
         except Exception as e:
             if self.logger:
                 self.logger.error(f"[Voice] Error in TTS: {e}")
 
-    def _play_audio(self, audio_data):
-        """Play audio data through output device"""
+    def _play_audio(self, response, key):
+        """Decode a streamed MP3 response through an ffmpeg pipe and play the PCM as it arrives"""
         try:
-            # Save to temporary file and play with sounddevice
-            import tempfile
-            import os
-            
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_path = temp_file.name
-            
-            # Convert MP3 to WAV for playback (requires pydub)
+            decoder = subprocess.Popen(
+                ['ffmpeg', '-loglevel', 'quiet', '-i', 'pipe:0',
+                 '-f', 's16le', '-ar', str(TTS_SAMPLE_RATE), '-ac', '1', 'pipe:1'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        except OSError as e:
+            response.close()
+            if self.logger:
+                self.logger.error(f"[Voice] ffmpeg not available for playback: {e}")
+            return
+
+        fed = threading.Event()
+
+        def feed():
             try:
-                from pydub import AudioSegment
-                from pydub.playback import play
-                
-                audio = AudioSegment.from_mp3(temp_path)
-                play(audio)
-            except ImportError:
-                # Fallback: use system player
+                for chunk in response.iter_content(8192):
+                    decoder.stdin.write(chunk)
+                fed.set()
+            except Exception as e:
                 if self.logger:
-                    self.logger.warning("[Voice] pydub not available, using system audio player")
-                os.system(f"afplay '{temp_path}'")  # macOS
-            
-            # Cleanup
-            os.unlink(temp_path)
-            
+                    self.logger.error(f"[Voice] Error streaming TTS audio: {e}")
+            finally:
+                response.close()
+                try:
+                    decoder.stdin.close()
+                except OSError:
+                    pass
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        chunks = []
+        try:
+            with sd.OutputStream(samplerate=TTS_SAMPLE_RATE, channels=1, dtype='int16',
+                                 device=self.output_device) as stream:
+                while True:
+                    pcm = decoder.stdout.read(TTS_CHUNK_SAMPLES * 2)
+                    if not pcm:
+                        break
+                    # A trailing odd byte can only come from a truncated stream
+                    samples = np.frombuffer(pcm[:len(pcm) & ~1], dtype=np.int16)
+                    chunks.append(samples)
+                    stream.write(samples)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"[Voice] Error playing audio: {e}")
+        finally:
+            decoder.stdout.close()
+            decoder.wait()
+        feeder.join()
+        
+        # Only cache replies that downloaded and decoded completely
+        if chunks and fed.is_set() and decoder.returncode == 0:
+            with self._tts_cache_lock:
+                self._tts_cache[key] = np.concatenate(chunks)
+                self._tts_cache.move_to_end(key)
+                if len(self._tts_cache) > TTS_CACHE_SIZE:
+                    self._tts_cache.popitem(last=False)
+
+    def _play_pcm(self, pcm):
+        """Play cached int16 PCM through the output device"""
+        try:
+            with sd.OutputStream(samplerate=TTS_SAMPLE_RATE, channels=1, dtype='int16',
+                                 device=self.output_device) as stream:
+                stream.write(pcm)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"[Voice] Error playing audio: {e}")
@@ -308,6 +464,21 @@ class VoiceManager:
             self.active = False
             return
         self.active = True
+        # Open the input device once; push-to-talk only gates which frames are kept
+        try:
+            self.stream = sd.InputStream(
+                device=self.input_device,
+                channels=self.channels,
+                samplerate=self.sample_rate,
+                blocksize=RECORD_BLOCKSIZE,
+                callback=self._audio_callback,
+                dtype=np.float32
+            )
+            self.stream.start()
+        except Exception as e:
+            self.stream = None
+            if self.logger:
+                self.logger.error(f"[Voice] Error opening input stream: {e}")
         if self.logger:
             self.logger.info("[Voice] Voice system ready. Use start_recording()/stop_recording() for voice commands.")
 
@@ -317,9 +488,18 @@ class VoiceManager:
         # Voice system runs on callbacks and threads, no polling needed
         pass
 
+    async def run(self):
+        """Voice runs on callbacks and threads; just stay alive until stopped"""
+        while self.active:
+            await asyncio.sleep(1)
+
     def stop(self):
         if self.logger:
             self.logger.info("[Voice] Stopping...")
         if self.recording:
             self.stop_recording()
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
         self.active = False